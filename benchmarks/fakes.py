@@ -0,0 +1,171 @@
+"""In-process stand-ins for the CoC API and Discord used by the benchmarks"""
+import asyncio
+import heapq
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Deque, Dict, List, Optional, Tuple
+
+import coc
+
+LEGEND_LEAGUE = SimpleNamespace(id=29000022, name="Legend League", icon=None)
+
+
+class FakeCocWorld:
+    """Scripted Legend League players served through fake coc.Client objects.
+
+    Each player attacks or is attacked at exponentially distributed intervals
+    averaging hit_interval seconds. Every hit's time is remembered until the bot
+    reports the change, which gives the detection latency.
+    """
+
+    def __init__(
+            self,
+            tags: List[str],
+            latency: float = 0.05,
+            jitter: float = 0.02,
+            throttle_rate: float = 0.0,
+            hit_interval: float = 60.0,
+            max_age: float = 0,
+            seed: int = 1
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.hit_interval = hit_interval
+        self.max_age = max_age
+        self.random = random.Random(seed)
+
+        self.players: Dict[str, Dict[str, int]] = {
+            coc.utils.correct_tag(tag): {"trophies": 5000, "attack_wins": 0, "defense_wins": 0}
+            for tag in tags
+        }
+        self.calls = 0
+        self.throttled = 0
+        self.hits = 0
+        self.latencies: List[float] = []
+        self._pending_hits: Dict[str, Deque[float]] = {tag: deque() for tag in self.players}
+        self._task: Optional[asyncio.Task] = None
+
+    def client(self) -> "FakeCocClient":
+        return FakeCocClient(self)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        now = time.monotonic()
+        schedule: List[Tuple[float, str]] = [
+            (now + self.random.expovariate(1 / self.hit_interval), tag) for tag in self.players
+        ]
+        heapq.heapify(schedule)
+        while True:
+            due, tag = schedule[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heapreplace(schedule, (due + self.random.expovariate(1 / self.hit_interval), tag))
+            self._apply_hit(tag)
+
+    def _apply_hit(self, tag: str):
+        player = self.players[tag]
+        if self.random.random() < 0.5:
+            player["trophies"] += self.random.choice((5, 16, 24, 32, 40))
+            player["attack_wins"] += 1
+        else:
+            player["trophies"] -= self.random.choice((5, 16, 24, 32, 40))
+        self.hits += 1
+        self._pending_hits[tag].append(time.monotonic())
+
+    def detected(self, tag: str):
+        """Record the latency of every hit on tag the bot hasn't reported yet"""
+        pending = self._pending_hits.get(coc.utils.correct_tag(tag))
+        now = time.monotonic()
+        while pending:
+            self.latencies.append(now - pending.popleft())
+
+    def snapshot(self, tag: str) -> SimpleNamespace:
+        state = self.players[tag]
+        return SimpleNamespace(
+            tag=tag,
+            name=f"Player {tag}",
+            trophies=state["trophies"],
+            best_trophies=state["trophies"],
+            attack_wins=state["attack_wins"],
+            defense_wins=state["defense_wins"],
+            town_hall=16,
+            league=LEGEND_LEAGUE,
+            clan=None,
+            _response_retry=self.max_age
+        )
+
+
+class FakeCocClient:
+    """Implements the coc.Client methods the key pool calls"""
+
+    def __init__(self, world: FakeCocWorld):
+        self.world = world
+
+    async def get_player(self, tag: str):
+        world = self.world
+        await asyncio.sleep(world.latency + world.random.random() * world.jitter)
+        world.calls += 1
+        if world.random.random() < world.throttle_rate:
+            world.throttled += 1
+            raise coc.HTTPException(429, {"reason": "requestThrottled", "message": "Injected by the benchmark"})
+        if tag not in world.players:
+            raise coc.NotFound(404, {"reason": "notFound", "message": "Unknown player"})
+        return world.snapshot(tag)
+
+    async def close(self):
+        pass
+
+
+class FakeChannel:
+    """Discord text channel that records what is sent to it"""
+
+    def __init__(self, channel_id: int, latency: float = 0.0):
+        self.id = channel_id
+        self.name = f"tracker-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+        self.latency = latency
+        self.messages = 0
+
+    async def send(self, content=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages += 1
+
+
+class FakeBot:
+    """The parts of commands.Bot the player cog touches"""
+
+    def __init__(self, channels: Dict[int, FakeChannel]):
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self._closed = False
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            raise LookupError(channel_id)
+        return channel
+
+    async def wait_until_ready(self):
+        pass
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        self._closed = True
@@ -0,0 +1,232 @@
+"""Offline benchmark of the tracking pipeline.
+
+Runs the real player cog, CoC key pool, write buffer and database operations
+against a fake CoC API, fake Discord channels and mongomock (or a local mongod
+given with --mongo-uri), then reports throughput, API calls per detected hit,
+detection latency percentiles and memory per tracked player.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.run --players 100 1000 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+# Production defaults of TRACKING_INTERVAL, TRACKING_MIN_INTERVAL, TRACKING_MAX_INTERVAL and COC_CACHE_TTL;
+# runs keep their ratios so a shortened schedule behaves like production does
+PRODUCTION_INTERVAL = 30
+PRODUCTION_MIN_INTERVAL = 15
+PRODUCTION_MAX_INTERVAL = 180
+PRODUCTION_CACHE_TTL = 30
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 1000], help="Tracked player counts to run")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of live tracking measured per run")
+    parser.add_argument(
+        "--warmup", type=float, default=None,
+        help="Seconds of tracking before measuring, while first polls seed every player; defaults to --interval"
+    )
+    parser.add_argument("--hit-interval", type=float, default=20, help="Mean seconds between hits on a player")
+    parser.add_argument(
+        "--interval", type=float, default=None,
+        help="TRACKING_INTERVAL for the run; defaults to the production ratio to --min-interval"
+    )
+    parser.add_argument("--min-interval", type=float, default=2, help="TRACKING_MIN_INTERVAL for the run")
+    parser.add_argument(
+        "--max-interval", type=float, default=None,
+        help="TRACKING_MAX_INTERVAL for the run; defaults to the production ratio to --min-interval"
+    )
+    parser.add_argument("--keys", type=int, default=2, help="Fake CoC API keys in the pool")
+    parser.add_argument("--rate", type=float, default=200, help="Requests per second per key")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake CoC API latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of CoC requests answered with 429")
+    parser.add_argument(
+        "--cache-ttl", type=float, default=None,
+        help="COC_CACHE_TTL for the run; defaults to the production ratio to --min-interval"
+    )
+    parser.add_argument("--send-latency", type=float, default=0.0, help="Fake Discord send latency in seconds")
+    parser.add_argument("--mongo-uri", default=None, help="Use this MongoDB instead of mongomock")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    scale = args.min_interval / PRODUCTION_MIN_INTERVAL
+    if args.interval is None:
+        args.interval = PRODUCTION_INTERVAL * scale
+    if args.warmup is None:
+        args.warmup = args.interval
+    if args.max_interval is None:
+        args.max_interval = PRODUCTION_MAX_INTERVAL * scale
+    if args.cache_ttl is None:
+        args.cache_ttl = PRODUCTION_CACHE_TTL * scale
+    return args
+
+
+def configure_environment(args):
+    """Settings are read from the environment when the bot's modules are first imported"""
+    os.environ.update({
+        "TRACKING_BACKEND": "poll",
+        "SHARDING_ENABLED": "false",
+        "TRACKING_INTERVAL": str(args.interval),
+        "TRACKING_MIN_INTERVAL": str(args.min_interval),
+        "TRACKING_MAX_INTERVAL": str(args.max_interval),
+        "COC_CACHE_TTL": str(args.cache_ttl),
+        "COC_MAX_IN_FLIGHT": str(max(10, int(args.keys * args.rate))),
+        "TRACKING_MESSAGE_WINDOW": "0.5",
+        "METRICS_PORT": "0",
+        "LOG_LEVEL": "WARNING",
+    })
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def connect_database(mongo_uri: str):
+    from database.mongo_utils import MongoManager
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_uri)
+        await client.drop_database("coc_bot")
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    MongoManager._instance = client
+
+
+async def run_once(args, player_count: int) -> Dict[str, Any]:
+    import services.coc_api as coc_api
+    import database.operations as operations
+    from benchmarks.fakes import FakeBot, FakeChannel, FakeCocWorld
+    from cogs.player.commands import PlayerCommands
+    from utils.legend_day import get_legend_day_bounds
+
+    await connect_database(args.mongo_uri)
+    await operations.ensure_indexes()
+
+    tags = [f"P{index:07d}" for index in range(player_count)]
+    channels = {1000 + index: FakeChannel(1000 + index, latency=args.send_latency) for index in range(player_count)}
+    world = FakeCocWorld(
+        tags,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        hit_interval=args.hit_interval
+    )
+
+    pool = coc_api.CocClientPool([], 0, args.rate)
+    pool.keys = [coc_api.CocKey(f"fake/{index}", world.client(), args.rate) for index in range(args.keys)]
+    coc_api._coc_pool = pool
+    coc_api._player_cache.clear()
+
+    results: Dict[str, Any] = {"players": player_count}
+
+    # Register every player the way /player track does
+    stage_start = time.perf_counter()
+    for index, tag in enumerate(tags):
+        await operations.save_tracking_channel(index, tag, 1000 + index)
+    results["db_save_s"] = time.perf_counter() - stage_start
+    await operations.load_tracking_cache()
+
+    # Measured after the seed so mongomock's in-process documents aren't counted
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+
+    bot = FakeBot(channels)
+    cog = PlayerCommands(bot)
+    detect = cog.handle_trophy_change
+
+    async def timed_handle_trophy_change(tag, old_trophies, player, channel_ids):
+        world.detected(tag)
+        await detect(tag, old_trophies, player, channel_ids)
+
+    cog.handle_trophy_change = timed_handle_trophy_change
+
+    stage_start = time.perf_counter()
+    await asyncio.gather(*(cog.track_trophies(tag, 1000 + index) for index, tag in enumerate(tags)))
+    results["track_s"] = time.perf_counter() - stage_start
+    results["memory_per_player_bytes"] = (tracemalloc.get_traced_memory()[0] - memory_before) / player_count
+    tracemalloc.stop()
+
+    # First polls are staggered over TRACKING_INTERVAL; hits start once every player is seeded
+    await asyncio.sleep(args.warmup)
+
+    # Live tracking against scripted hits
+    calls_before = world.calls
+    world.start()
+    await asyncio.sleep(args.duration)
+    world.stop()
+    calls = world.calls - calls_before
+    results.update({
+        "polls_per_s": calls / args.duration,
+        "hits": world.hits,
+        "detected": len(world.latencies),
+        "api_calls_per_detection": calls / len(world.latencies) if world.latencies else None,
+        "throttled": world.throttled,
+        "latency_p50_s": percentile(world.latencies, 0.5),
+        "latency_p99_s": percentile(world.latencies, 0.99),
+        "discord_sends": cog.outbox.sent,
+        "discord_coalesced": cog.outbox.coalesced,
+        "state_bytes_per_player": cog.states.memory_report()["bytes_per_player"],
+    })
+
+    # The legend reset: summaries plus one batched snapshot of every start trophy count
+    stage_start = time.perf_counter()
+    await cog.run_daily_summary(reset_time=get_legend_day_bounds()[0])
+    results["reset_s"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    for tag in tags:
+        await operations.update_trophy_count(tag, 5100)
+        await operations.record_trophy_event(tag, 5060, 5100)
+    await operations.flush_trophy_updates()
+    results["db_write_s"] = time.perf_counter() - stage_start
+
+    await cog.cog_unload()
+    bot.close()
+    await operations.close_trophy_updates()
+    return results
+
+
+def print_table(runs: List[Dict[str, Any]]):
+    columns = list(runs[0])
+    width = max(len(column) for column in columns)
+    for column in columns:
+        values = []
+        for run in runs:
+            value = run[column]
+            values.append(f"{value:>12.3f}" if isinstance(value, float) else f"{str(value):>12}")
+        print(f"{column:<{width}} " + " ".join(values))
+
+
+async def main():
+    args = parse_args()
+    configure_environment(args)
+    # Run from the repository root so the bot's packages import as they do in production
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from utils.logging_config import setup_logging, stop_logging
+    setup_logging()
+    try:
+        runs = [await run_once(args, player_count) for player_count in args.players]
+    finally:
+        stop_logging()
+
+    if args.json:
+        print(json.dumps(runs, indent=2))
+    else:
+        print_table(runs)
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import logging
+from datetime import datetime
+
+from services.coc_api import get_coc_key_stats, get_player_cache_stats
+from utils.config import PROFILE_MAX_SECONDS
+from utils.legend_day import get_legend_day
+
+logger = logging.getLogger(__name__)
+
+
+class AdminCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="debug", description="Show event loop and tracking health")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug(self, interaction: discord.Interaction):
+        """Show event loop lag, slow callbacks and tracking stats"""
+        monitor = getattr(self.bot, "loop_monitor", None)
+        if not monitor:
+            await interaction.response.send_message("The event loop monitor is not running.", ephemeral=True)
+            return
+
+        report = monitor.report()
+        embed = discord.Embed(title="🩺 Bot Health", color=discord.Color.blue())
+        embed.add_field(name="Event Loop", value=f"`{report['loop']}`\n{report['tasks']} tasks", inline=False)
+        embed.add_field(
+            name=f"Loop Lag (last {report['window']:.0f}s)",
+            value=(
+                f"current {report['lag_current'] * 1000:.1f}ms · p50 {report['lag_p50'] * 1000:.1f}ms · "
+                f"p99 {report['lag_p99'] * 1000:.1f}ms · max {report['lag_max'] * 1000:.1f}ms"
+            ),
+            inline=False
+        )
+
+        if not report["slow_callbacks_monitored"]:
+            embed.add_field(
+                name="Slowest Recent Callbacks",
+                value=f"⚠️ Not monitored on `{report['loop']}`; set `USE_UVLOOP=false` to see them",
+                inline=False
+            )
+        elif report["slow_callbacks"]:
+            lines = [
+                f"{duration * 1000:.0f}ms <t:{int(timestamp)}:R> `{name[:80]}`"
+                for timestamp, duration, name in report["slow_callbacks"]
+            ]
+            embed.add_field(name="Slowest Recent Callbacks", value="\n".join(lines), inline=False)
+        else:
+            embed.add_field(name="Slowest Recent Callbacks", value="None", inline=False)
+
+        player_cog = self.bot.get_cog("PlayerCommands")
+        if player_cog:
+            memory = player_cog.states.memory_report()
+            activity = player_cog.states.activity_report(get_legend_day())
+            embed.add_field(
+                name="Tracking",
+                value=(
+                    f"{player_cog.change_detector.tag_count} players · "
+                    f"{player_cog.change_detector.subscription_count} channels · "
+                    f"{player_cog.outbox.pending_count} queued messages\n"
+                    f"State table {memory['bytes'] / 1024:.0f}KiB, "
+                    f"{memory['bytes_per_player']:.0f}B per player\n"
+                    f"Today ⚔️ {activity['attacks']} attacks +{activity['offense_trophies']} · "
+                    f"🛡️ {activity['defenses']} defenses -{activity['defense_trophies']} · "
+                    f"{activity['history']} recent hits held"
+                ),
+                inline=False
+            )
+
+        cache = get_player_cache_stats()
+        keys = get_coc_key_stats()
+        available = sum(1 for key in keys if key["available"])
+        embed.add_field(
+            name="CoC API",
+            value=(
+                f"{available}/{len(keys)} keys available · cache {cache['size']} entries, "
+                f"{cache['hits']} hits / {cache['misses']} misses"
+            ),
+            inline=False
+        )
+
+        embed.timestamp = datetime.utcnow()
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="profile", description="Profile the bot for a while and summarize the hot spots")
+    @app_commands.describe(seconds="How long to profile for")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def profile(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 30):
+        """Run cProfile and tracemalloc over a window and reply with the top functions and allocation sites"""
+        profiler = getattr(self.bot, "profiler", None)
+        if not profiler:
+            await interaction.response.send_message("Profiling is not available.", ephemeral=True)
+            return
+        if profiler.active:
+            await interaction.response.send_message("A profile is already running.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            summary = await profiler.run(seconds)
+        except Exception as e:
+            logger.error(f"Error profiling: {e}")
+            await interaction.followup.send(f"❌ Profiling failed: {e}", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🔬 Profile",
+            description=f"{summary['duration']:.0f}s profile written to `{summary['path']}`",
+            color=discord.Color.blue()
+        )
+        functions = [
+            f"{own_time * 1000:7.0f}ms {total_time * 1000:7.0f}ms {calls:>7} {name[-60:]}"
+            for name, calls, own_time, total_time in summary["top_functions"][:8]
+        ]
+        embed.add_field(
+            name="Top Functions (own · total · calls)",
+            value=_code_block(functions),
+            inline=False
+        )
+        allocations = [
+            f"{size / 1024:+9.1f}KiB {count:+7} {location[-60:]}"
+            for location, size, count in summary["top_allocations"][:8]
+        ]
+        embed.add_field(
+            name="Top Allocation Sites (growth · blocks)",
+            value=_code_block(allocations),
+            inline=False
+        )
+        embed.timestamp = datetime.utcnow()
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+def _code_block(lines) -> str:
+    """Fit lines into an embed field"""
+    if not lines:
+        return "None"
+    text = "\n".join(lines)[:1000]
+    return f"```\n{text}\n```"
+
+
+async def setup(bot):
+    await bot.add_cog(AdminCommands(bot))
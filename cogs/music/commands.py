@@ -4,6 +4,10 @@ from discord.ext import commands
 import wavelink
 import logging
 from typing import Dict, List
+from utils.metrics import Gauge
+
+MUSIC_QUEUED_TRACKS = Gauge("music_queued_tracks", "Tracks waiting in music queues across all guilds")
+MUSIC_VOICE_CONNECTIONS = Gauge("music_voice_connections", "Connected voice clients")
 
 
 class MusicCommands(commands.Cog):
@@ -12,6 +16,13 @@ class MusicCommands(commands.Cog):
         self.playing_tracks: Dict[int, wavelink.Playable] = {}
         self.queues: Dict[int, List[wavelink.Playable]] = {}
 
+        MUSIC_QUEUED_TRACKS.set_function(lambda: sum(len(queue) for queue in self.queues.values()))
+        MUSIC_VOICE_CONNECTIONS.set_function(lambda: len(self.bot.voice_clients))
+
+    async def cog_unload(self):
+        MUSIC_QUEUED_TRACKS.set_function(None)
+        MUSIC_VOICE_CONNECTIONS.set_function(None)
+
     music = app_commands.Group(name="music", description="Music commands")
 
     @music.command(name="play", description="Play a song from YouTube/Spotify")
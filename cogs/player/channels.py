@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelResolver:
+    """Resolves tracking channel ids to channel objects.
+
+    Hits come from discord.py's channel cache, misses are fetched concurrently under
+    a cap, and failures are remembered: deleted channels for good and other errors
+    for negative_ttl seconds, so reconnects don't fetch the same ids again.
+    """
+
+    def __init__(self, bot, max_concurrency: int = 10, negative_ttl: float = 600):
+        self.bot = bot
+        self.negative_ttl = negative_ttl
+        self.fetches = 0
+
+        self._fetched: Dict[int, discord.abc.GuildChannel] = {}
+        self._retry_after: Dict[int, float] = {}
+        self._dead: Set[int] = set()
+        self._fetch_slots = asyncio.Semaphore(max_concurrency)
+
+    def get(self, channel_id: int):
+        """Get a channel from the cache without any API call"""
+        return self.bot.get_channel(channel_id) or self._fetched.get(channel_id)
+
+    def is_dead(self, channel_id: int) -> bool:
+        return channel_id in self._dead
+
+    def forget(self, channel_id: int):
+        """Drop anything remembered about a channel, e.g. after it is reused for tracking"""
+        self._fetched.pop(channel_id, None)
+        self._retry_after.pop(channel_id, None)
+        self._dead.discard(channel_id)
+
+    async def resolve(self, channel_id: int) -> Optional[discord.abc.GuildChannel]:
+        """Get a channel from the cache, fetching it if it isn't known to be missing"""
+        channel = self.get(channel_id)
+        if channel:
+            return channel
+        if channel_id in self._dead or self._retry_after.get(channel_id, 0) > time.monotonic():
+            return None
+
+        async with self._fetch_slots:
+            self.fetches += 1
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except discord.NotFound:
+                self._dead.add(channel_id)
+                return None
+            except Exception as e:
+                logger.error(f"Error fetching channel {channel_id}: {e}")
+                self._retry_after[channel_id] = time.monotonic() + self.negative_ttl
+                return None
+
+        self._fetched[channel_id] = channel
+        return channel
+
+    async def resolve_many(self, channel_ids: Iterable[int]) -> Dict[int, discord.abc.GuildChannel]:
+        """Resolve many channels concurrently; unresolvable ids are left out"""
+        channel_ids = list(dict.fromkeys(channel_ids))
+        channels = await asyncio.gather(*(self.resolve(channel_id) for channel_id in channel_ids))
+        return {channel_id: channel for channel_id, channel in zip(channel_ids, channels) if channel}
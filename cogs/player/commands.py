@@ -3,64 +3,194 @@ from discord import app_commands
 from discord.ext import commands
 from datetime import datetime, timedelta
 import asyncio
+import logging
+import time
 import pytz
+from typing import Dict
 from database.operations import (
     save_player_link, get_player_by_discord_id, save_tracking_channel,
-    update_trophy_count, get_tracking_channels, get_tracking_channel,
-    remove_tracking_channel, get_player_by_tag, get_tracked_player_count, get_tracked_players_by_discord_id
+    update_trophy_count, bulk_update_trophy_counts, flush_trophy_updates,
+    get_tracking_channels, get_tracking_channel, remove_tracking_channel,
+    get_player_by_tag, get_tracked_players_by_discord_id, record_trophy_event, load_tracking_cache,
+    get_daily_stats, mark_tracking_channels_dead
 )
 from services.coc_api import get_player_info
+from services.coc_events import EventsTrophyDetector
+from cogs.player.scheduler import PollScheduler
+from cogs.player.sharding import ShardCoordinator
+from cogs.player.outbox import ChannelOutbox
+from cogs.player.channels import ChannelResolver
+from cogs.player.reset import LegendResetScheduler
+from utils.config import (
+    TRACKING_BACKEND, TRACKING_INTERVAL, TRACKING_MIN_INTERVAL, TRACKING_MAX_INTERVAL, TROPHY_HISTORY_SIZE, MONGO_CHANGE_STREAMS,
+    SHARDING_ENABLED, WORKER_ID, SHARD_LEASE_TTL, SHARD_HEARTBEAT_INTERVAL, SHARD_RECONCILE_INTERVAL,
+    TRACKING_MESSAGE_WINDOW, TRACKING_MESSAGE_BACKLOG, DISCORD_SEND_CONCURRENCY
+)
+from utils.trophy_tracker import AdaptivePollInterval
+from utils.player_state import PlayerStateTable
+from utils.legend_day import get_legend_day
+from utils.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+TRACKED_PLAYERS = Gauge("tracking_players", "Players this worker is tracking")
+TRACKING_SUBSCRIPTIONS = Gauge("tracking_subscriptions", "Tracked player and channel pairs on this worker")
+OUTBOX_PENDING = Gauge("tracking_outbox_pending", "Tracking messages waiting to be sent")
 
 
 class PlayerCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.tracking_tasks = {}
         self.timezone = pytz.timezone('America/Phoenix')
         self.MAX_TRACKED_PLAYERS = 3
-        self.bot.loop.create_task(self.schedule_daily_summary())
+        self.TRACKING_INTERVAL = TRACKING_INTERVAL
+        self.CHANNEL_FETCH_CONCURRENCY = 10
+
+        # Per-tag tracking state shared by every channel tracking the tag, and by the poll scheduler
+        self.states = PlayerStateTable(TROPHY_HISTORY_SIZE)
+        # /player track setups in flight, referenced so they aren't garbage collected mid-run
+        self.setup_tasks = set()
+
+        # Tracking channels are resolved once and failures remembered across reconnects
+        self.channels = ChannelResolver(bot, max_concurrency=self.CHANNEL_FETCH_CONCURRENCY)
+        self.tracking_resumed = False
+
+        # Tracking messages are coalesced per channel and sent under one concurrency limit
+        self.outbox = ChannelOutbox(
+            self.channels.get,
+            window=TRACKING_MESSAGE_WINDOW,
+            max_concurrency=DISCORD_SEND_CONCURRENCY,
+            max_pending=TRACKING_MESSAGE_BACKLOG
+        )
+
+        # Both backends register each tracked tag once and report trophy deltas to handle_trophy_change
+        if TRACKING_BACKEND == "events":
+            self.change_detector = EventsTrophyDetector(self.handle_trophy_change, interval=self.TRACKING_INTERVAL)
+        else:
+            self.change_detector = PollScheduler(
+                self.poll_player,
+                self.handle_player_update,
+                interval=self.TRACKING_INTERVAL,
+                interval_policy=AdaptivePollInterval(TRACKING_MIN_INTERVAL, TRACKING_MAX_INTERVAL),
+                states=self.states
+            )
+        self.change_detector.start()
+
+        TRACKED_PLAYERS.set_function(lambda: self.change_detector.tag_count)
+        TRACKING_SUBSCRIPTIONS.set_function(lambda: self.change_detector.subscription_count)
+        OUTBOX_PENDING.set_function(lambda: self.outbox.pending_count)
+
+        # In sharding mode this worker only tracks the players it owns
+        self.shard_coordinator = None
+        if SHARDING_ENABLED:
+            self.shard_coordinator = ShardCoordinator(
+                WORKER_ID,
+                self.rebalance_tracking,
+                lease_ttl=SHARD_LEASE_TTL,
+                heartbeat_interval=SHARD_HEARTBEAT_INTERVAL,
+                reconcile_interval=SHARD_RECONCILE_INTERVAL
+            )
+
+        # The 10 PM reset runs once per legend day, surviving restarts; sharded workers each reset their own players
+        self.legend_reset = LegendResetScheduler(WORKER_ID if SHARDING_ENABLED else "default", self.run_legend_reset)
+
+    async def cog_unload(self):
+        for gauge in (TRACKED_PLAYERS, TRACKING_SUBSCRIPTIONS, OUTBOX_PENDING):
+            gauge.set_function(None)
+        await self.change_detector.stop()
+        self.legend_reset.stop()
+        if self.shard_coordinator:
+            await self.shard_coordinator.stop()
+        await self.outbox.close()
+
+    def owns_player(self, tag: str) -> bool:
+        """Whether this worker polls and posts for the player"""
+        return self.shard_coordinator is None or self.shard_coordinator.owns(tag)
+
+    async def rebalance_tracking(self):
+        """Subscribe to players this worker now owns and drop the ones it no longer does"""
+        # Without a change stream, pick up players tracked or untracked through other workers
+        if not MONGO_CHANGE_STREAMS:
+            await load_tracking_cache()
+
+        tracked_channels = await get_tracking_channels()
+        wanted = {
+            (channel_info["player_tag"], channel_info["channel_id"])
+            for channel_info in tracked_channels
+            if not channel_info.get("channel_dead") and self.owns_player(channel_info["player_tag"])
+        }
+
+        missing = [
+            (tag, channel_id) for tag, channel_id in wanted
+            if not self.change_detector.is_subscribed(tag, channel_id)
+        ]
+        if missing:
+            channels = await self.channels.resolve_many(channel_id for _, channel_id in missing)
+            for tag, channel_id in missing:
+                if channel_id in channels:
+                    self.change_detector.subscribe(tag, channel_id)
+
+        for tag in self.change_detector.tags:
+            for channel_id in self.change_detector.get_channels(tag):
+                if (tag, channel_id) not in wanted:
+                    self.stop_tracking(tag, channel_id)
 
     async def setup_tracking_for_all_players(self):
         """Resume tracking for all players when bot starts"""
         try:
             await self.bot.wait_until_ready()
-            tracked_channels = await get_tracking_channels()
-            print(f"Found {len(tracked_channels)} tracked players to resume")
-
+            resume_start = time.perf_counter()
+            if self.shard_coordinator:
+                # Build the ring first so this worker only resumes the players it owns
+                await self.shard_coordinator.join()
+            tracked_channels = [
+                channel_info for channel_info in await get_tracking_channels()
+                if not channel_info.get("channel_dead") and self.owns_player(channel_info["player_tag"])
+            ]
+            logger.info(f"Found {len(tracked_channels)} tracked players to resume")
+
+            # Channels missing from the cache are fetched concurrently, not one by one
+            channels = await self.channels.resolve_many(channel_info["channel_id"] for channel_info in tracked_channels)
+
+            dead_tags = []
+            unresolved = 0
             for channel_info in tracked_channels:
-                try:
-                    tag = channel_info["player_tag"]
-                    channel_id = channel_info["channel_id"]
-
-                    channel = self.bot.get_channel(channel_id)
-                    if not channel:
-                        print(f"Warning: Cannot find channel {channel_id} for player {tag}")
-                        try:
-                            channel = await self.bot.fetch_channel(channel_id)
-                            if channel:
-                                print(f"Successfully fetched channel {channel_id}")
-                        except Exception as e:
-                            print(f"Error fetching channel {channel_id}: {e}")
-                            continue
-
-                    if channel:
-                        task_key = (tag, channel_id)
-                        if task_key not in self.tracking_tasks:
-                            self.tracking_tasks[task_key] = self.bot.loop.create_task(
-                                self.track_trophies(tag, channel_id)
-                            )
-                            print(f"Resumed tracking for player {tag} in channel {channel.name} ({channel_id})")
-                except Exception as e:
-                    print(f"Error resuming tracking for player {tag}: {e}")
+                tag = channel_info["player_tag"]
+                channel_id = channel_info["channel_id"]
+                if channel_id not in channels:
+                    if self.channels.is_dead(channel_id):
+                        dead_tags.append(tag)
+                    else:
+                        unresolved += 1
                     continue
 
+                if not self.change_detector.is_subscribed(tag, channel_id):
+                    # The first poll seeds the trophy baseline for resumed players
+                    self.change_detector.subscribe(tag, channel_id)
+
+            # Deleted channels are skipped on future starts until the player is tracked again
+            await mark_tracking_channels_dead(dead_tags)
+            logger.info(
+                f"Resumed tracking for {self.change_detector.tag_count} players in "
+                f"{time.perf_counter() - resume_start:.2f}s ({self.channels.fetches} channel fetches, "
+                f"{len(dead_tags)} deleted channels, {unresolved} unreachable channels)"
+            )
+
         except Exception as e:
-            print(f"Error setting up tracking for all players: {e}")
+            logger.error(f"Error setting up tracking for all players: {e}")
+
+        if self.shard_coordinator:
+            self.shard_coordinator.start()
+        self.legend_reset.start()
 
     @commands.Cog.listener()
     async def on_ready(self):
         """Called when the bot is ready. Set up tracking here."""
-        print("Bot is ready, setting up tracking...")
+        # on_ready also fires after reconnects, when every subscription is still in place
+        if self.tracking_resumed:
+            return
+        self.tracking_resumed = True
+        logger.info("Bot is ready, setting up tracking...")
         await self.setup_tracking_for_all_players()
 
     player_group = app_commands.Group(name="player", description="Player-related commands")
@@ -117,12 +247,9 @@ class PlayerCommands(commands.Cog):
                 return
 
             channel_id = tracking_info["channel_id"]
-            task_key = (tag, channel_id)
 
-            # Cancel this specific tracking task
-            if task_key in self.tracking_tasks:
-                self.tracking_tasks[task_key].cancel()
-                del self.tracking_tasks[task_key]
+            # Stop polling this player for this channel
+            self.stop_tracking(tag, channel_id)
 
             # Delete the channel
             channel = self.bot.get_channel(channel_id)
@@ -193,10 +320,10 @@ class PlayerCommands(commands.Cog):
             else:
                 tag = tag.replace('#', '')
 
+            tracked_players = await get_tracked_players_by_discord_id(interaction.user.id)
+
             # Check if user has reached the tracking limit
-            tracked_count = await get_tracked_player_count(interaction.user.id)
-            if tracked_count >= self.MAX_TRACKED_PLAYERS:
-                tracked_players = await get_tracked_players_by_discord_id(interaction.user.id)
+            if len(tracked_players) >= self.MAX_TRACKED_PLAYERS:
                 formatted_players = []
                 for player_info in tracked_players:
                     try:
@@ -212,7 +339,6 @@ class PlayerCommands(commands.Cog):
                 return
 
             # Check if this user is already tracking this player
-            tracked_players = await get_tracked_players_by_discord_id(interaction.user.id)
             for tracked in tracked_players:
                 if tracked["player_tag"] == tag:
                     channel = self.bot.get_channel(tracked["channel_id"])
@@ -262,13 +388,10 @@ class PlayerCommands(commands.Cog):
             # Save channel info to database
             await save_tracking_channel(interaction.user.id, tag, tracking_channel.id)
 
-            # Start tracking task
-            task_key = (tag, tracking_channel.id)
-            if task_key in self.tracking_tasks:
-                self.tracking_tasks[task_key].cancel()
-            self.tracking_tasks[task_key] = self.bot.loop.create_task(
-                self.track_trophies(tag, tracking_channel.id)
-            )
+            # Start tracking
+            task = self.bot.loop.create_task(self.track_trophies(tag, tracking_channel.id))
+            self.setup_tasks.add(task)
+            task.add_done_callback(self.setup_tasks.discard)
 
             await interaction.followup.send(
                 f"Now tracking {player.name}'s Legend League attacks in {tracking_channel.mention}!"
@@ -320,9 +443,13 @@ class PlayerCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            for player_info in tracked_players:
+            # Fetch all players concurrently; the CoC client enforces the rate limit
+            players = await asyncio.gather(
+                *(get_player_info(player_info["player_tag"]) for player_info in tracked_players)
+            )
+
+            for player_info, player in zip(tracked_players, players):
                 try:
-                    player = await get_player_info(player_info["player_tag"])
                     channel = self.bot.get_channel(player_info["channel_id"])
 
                     value = f"Channel: {channel.mention if channel else 'Channel not found'}\n"
@@ -336,7 +463,7 @@ class PlayerCommands(commands.Cog):
                         inline=False
                     )
                 except Exception as e:
-                    print(f"Error getting player info for {player_info['player_tag']}: {e}")
+                    logger.error(f"Error getting player info for {player_info['player_tag']}: {e}")
                     continue
 
             await interaction.followup.send(embed=embed)
@@ -344,15 +471,15 @@ class PlayerCommands(commands.Cog):
             await interaction.followup.send(f"Error listing tracked players: {str(e)}")
 
     async def track_trophies(self, tag: str, channel_id: int):
-        """Background task to track trophy changes"""
-        channel = self.bot.get_channel(channel_id)
+        """Initialize tracking for a player and hand it to the poll scheduler"""
+        # The channel may have been reused for a new tracking entry
+        self.channels.forget(channel_id)
+        channel = await self.channels.resolve(channel_id)
         if not channel:
-            print(f"Could not find channel with ID {channel_id}")
+            logger.warning(f"Could not find channel with ID {channel_id}")
             return
 
         last_trophies = None
-        player = None
-        last_update_time = None
 
         # Initialize tracking with retries
         for attempt in range(3):
@@ -364,68 +491,124 @@ class PlayerCommands(commands.Cog):
                         return
 
                     last_trophies = player.trophies
+                    # Daily start trophies stay unset until the next 10 PM reset
                     channel_info = await get_tracking_channel(tag)
 
-                    # Set initial trophy count to 0 if no daily_start_trophy is set
-                    if channel_info and channel_info.get("daily_start_trophy") is None:
-                        await update_trophy_count(tag, 0, is_daily=True)
-                        print(f"Setting initial trophy count for {player.name} to 0 until next 10 PM reset")
-
                     await channel.send(
                         f"🏆 Starting Legend League trophy tracking for {player.name} at {last_trophies} trophies")
                     break
             except Exception as e:
-                print(f"Error on attempt {attempt + 1}/3 getting initial trophy count for {tag}: {e}")
+                logger.warning(f"Error on attempt {attempt + 1}/3 getting initial trophy count for {tag}: {e}")
                 await asyncio.sleep(2)
 
         if last_trophies is None:
             await channel.send(f"❌ Failed to initialize tracking. Please try again later.")
             return
 
-        while True:
-            try:
-                await asyncio.sleep(30)
-                current_time = datetime.now(self.timezone)
+        # The owning worker picks the player up on its next heartbeat
+        if not self.owns_player(tag):
+            return
+        self.change_detector.subscribe(tag, channel_id)
+        tracker = self.states.get_or_create(tag).tracker
+        if not tracker.seeded:
+            tracker.seed(
+                last_trophies,
+                player.attack_wins,
+                player.defense_wins,
+                daily_start=channel_info.get("daily_start_trophy") if channel_info else None,
+                daily_start_at=channel_info.get("last_daily_reset") if channel_info else None
+            )
 
-                player = await get_player_info(tag)
-                if not player or not player.league:
-                    continue
+    def stop_tracking(self, tag: str, channel_id: int = None):
+        """Stop tracking a player in one channel, or in every channel if none is given"""
+        self.change_detector.unsubscribe(tag, channel_id)
+        if self.change_detector.get_channels(tag):
+            return
+        self.states.pop(tag)
+
+    async def poll_player(self, tag: str):
+        """Poll backend: fetch fresh player data, refreshing the cache for commands"""
+        return await get_player_info(tag, use_cache=False)
+
+    async def handle_player_update(self, tag: str, player, channel_ids) -> bool:
+        """Poll backend: compare a scheduled poll result with the last seen trophy count.
+
+        Returns whether the trophy count changed, which drives the adaptive poll interval.
+        """
+        if not player or not player.league:
+            return False
+
+        if player.league.id != 29000022:
+            await self.stop_non_legend_tracking(tag, player, channel_ids)
+            return False
+
+        state = self.states.get(tag)
+        if state is None:
+            # Untracked while the poll was in flight
+            return False
+
+        tracker = state.tracker
+        if not tracker.seeded:
+            # Resumed players are seeded by their first poll
+            channel_info = await get_tracking_channel(tag)
+            tracker.seed(
+                player.trophies,
+                player.attack_wins,
+                player.defense_wins,
+                daily_start=channel_info.get("daily_start_trophy") if channel_info else None,
+                daily_start_at=channel_info.get("last_daily_reset") if channel_info else None
+            )
+            return False
 
-                if player.league.id != 29000022:
-                    await channel.send(f"❌ Stopping tracker - {player.name} is no longer in Legend League!")
-                    return
+        if player.trophies == tracker.last_count:
+            return False
 
-                # Check for 10 PM update only once
-                if current_time.hour == 22 and current_time.minute == 0:
-                    if last_update_time is None or (
-                            current_time.date() > last_update_time.date() or
-                            (current_time.date() == last_update_time.date() and
-                             current_time.hour > last_update_time.hour)
-                    ):
-                        await update_trophy_count(tag, player.trophies, is_daily=True)
-                        print(
-                            f"Updated daily start trophies for {player.name} to {player.trophies} at 10 PM Phoenix time")
-                        last_update_time = current_time
-
-                # Trophy change tracking
-                current_trophies = player.trophies
-                if current_trophies != last_trophies:
-                    trophy_change = current_trophies - last_trophies
-                    message = self.format_legend_league_change(player.name, trophy_change)
-                    await channel.send(message)
-                    last_trophies = current_trophies
-                    await update_trophy_count(tag, current_trophies, is_daily=False)
-
-            except asyncio.CancelledError:
-                print(f"Stopping trophy tracking for {player.name if player else tag}")
-                await channel.send(f"🔴 Trophy tracking stopped for {player.name if player else tag}")
-                return
-            except Exception as e:
-                print(f"Error in trophy tracking loop for {tag}: {e}")
-                await asyncio.sleep(5)
+        await self.handle_trophy_change(tag, tracker.last_count, player, channel_ids)
+        return True
+
+    async def handle_trophy_change(self, tag: str, old_trophies: int, player, channel_ids, old_player=None):
+        """Split a detected trophy delta into hits and fan them out to every channel tracking the player"""
+        if not player.league or player.league.id != 29000022:
+            await self.stop_non_legend_tracking(tag, player, channel_ids)
+            return
+
+        if not self.change_detector.get_channels(tag):
+            # Untracked while the update was in flight
+            return
+
+        # The tracker splits the delta into hits using the win counters and adds them to today's totals
+        tracker = self.states.get_or_create(tag).tracker
+        if not tracker.seeded:
+            # Events backend: the library's previous snapshot seeds resumed players, win counters included
+            if old_player is not None:
+                tracker.seed(old_trophies, old_player.attack_wins, old_player.defense_wins)
+            else:
+                tracker.seed(old_trophies)
+        changes = tracker.update_count(player.trophies, player.attack_wins, player.defense_wins)
+        if not changes:
+            return
+
+        messages = []
+        for change in changes:
+            await record_trophy_event(tag, change.old_count, change.new_count)
+            messages.append(self.format_legend_league_change(player.name, change.trophy_change))
+        message = "\n\n".join(messages)
+
+        for channel_id in channel_ids:
+            await self.outbox.send(channel_id, message)
+        await update_trophy_count(tag, player.trophies)
+
+    async def stop_non_legend_tracking(self, tag: str, player, channel_ids):
+        for channel_id in channel_ids:
+            await self.outbox.send(channel_id, f"❌ Stopping tracker - {player.name} is no longer in Legend League!")
+        self.stop_tracking(tag)
 
     def format_legend_league_change(self, player_name: str, trophy_change: int) -> str:
         """Format trophy change message specifically for Legend League"""
+        if trophy_change == 0:
+            return (f"🛡️ **DEFENSE WON!** \n"
+                   f"{player_name} held their base!\n"
+                   f"Trophy change: 0 🏆")
         if trophy_change > 0:
             if trophy_change == 40:  # Exactly 40 for 3-star
                 return (f"⚔️ **ATTACK WON!** \n"
@@ -492,112 +675,217 @@ class PlayerCommands(commands.Cog):
                        f"{player_name}'s base was 1-starred\n"
                        f"Trophy change: -{trophy_change} 🏆")
 
-    async def schedule_daily_summary(self):
-        """Schedule daily trophy summary at 10 PM Phoenix time"""
-        await self.bot.wait_until_ready()
-        last_summary_date = None
-
-        while not self.bot.is_closed():
-            try:
-                now = datetime.now(self.timezone)
-
-                if now.hour >= 22:
-                    next_summary = now + timedelta(days=1)
-                else:
-                    next_summary = now
-                next_summary = next_summary.replace(hour=22, minute=0, second=0, microsecond=0)
-
-                sleep_seconds = (next_summary - now).total_seconds()
-                await asyncio.sleep(sleep_seconds)
-
-                current_date = datetime.now(self.timezone).date()
-                if last_summary_date != current_date:
-                    await self.run_daily_summary()
-                    last_summary_date = current_date
-                    print(f"Daily summary completed at {datetime.now(self.timezone)}")
-
-            except Exception as e:
-                print(f"Error in schedule_daily_summary: {e}")
-                await asyncio.sleep(60)
+    async def run_legend_reset(self, reset_time: datetime):
+        """Summarize the legend day that just ended and start the new one"""
+        await self.run_daily_summary(reset_time=reset_time)
+        logger.info(f"Legend reset for {reset_time.date()} completed at {datetime.now(self.timezone)}")
+
+    async def run_daily_summary(self, specific_tag: str = None, reset_time: datetime = None):
+        """Run daily trophy summary for all tracked players.
+
+        Players are fetched concurrently, each player's attack/defense totals come from
+        its precomputed daily_stats rollup (or its tracker when there is none), the
+        tracker's history lists the latest hits and summaries are sent with a bounded
+        number of in-flight messages. With reset_time, this is the legend reset: the summary
+        covers the day that ended and every player's start trophies for the new day
+        are committed in one bulk write.
+        """
+        run_start = time.perf_counter()
+        timings = {}
+
+        # Make sure buffered trophy updates are visible before reading daily starts
+        try:
+            await flush_trophy_updates()
+        except Exception as e:
+            logger.error(f"Error flushing trophy updates before daily summary: {e}")
 
-    async def run_daily_summary(self, specific_tag: str = None):
-        """Run daily trophy summary for all tracked players"""
         tracked_channels = await get_tracking_channels()
         current_time = datetime.now(self.timezone)
+        # The reset summary covers the legend day that just ended
+        legend_day = get_legend_day(reset_time - timedelta(minutes=1) if reset_time else current_time)
 
         if specific_tag:
             tracked_channels = [ch for ch in tracked_channels if ch["player_tag"] == specific_tag]
-
-        print(f"Sending daily summary to {len(tracked_channels)} players")
-
+        else:
+            # Each worker summarizes the players it owns
+            tracked_channels = [ch for ch in tracked_channels if self.owns_player(ch["player_tag"])]
+
+        logger.info(f"Sending daily summary to {len(tracked_channels)} players")
+
+        # Stage 1: fetch every tracked player and its rollup once
+        stage_start = time.perf_counter()
+        tags = list(dict.fromkeys(ch["player_tag"] for ch in tracked_channels))
+        fetched, daily_stats = await asyncio.gather(
+            asyncio.gather(*(get_player_info(tag) for tag in tags), return_exceptions=True),
+            get_daily_stats(tags, legend_day)
+        )
+        players = {
+            tag: player for tag, player in zip(tags, fetched)
+            if player is not None and not isinstance(player, Exception)
+        }
+        timings["fetch"] = time.perf_counter() - stage_start
+
+        # Stage 2: render every summary
+        stage_start = time.perf_counter()
+        outgoing = []
         for channel_info in tracked_channels:
-            try:
-                channel = self.bot.get_channel(channel_info["channel_id"])
-                if not channel:
-                    print(f"Could not find channel {channel_info['channel_id']}")
-                    continue
-
-                tag = channel_info["player_tag"]
-                player = await get_player_info(tag)
+            tag = channel_info["player_tag"]
+            channel = self.channels.get(channel_info["channel_id"])
+            if not channel:
+                logger.warning(f"Could not find channel {channel_info['channel_id']}")
+                continue
 
-                if not player.league or player.league.id != 29000022:
-                    await channel.send(f"❌ Daily Summary: {player.name} is no longer in Legend League!")
-                    continue
-
-                # Handle case where daily_start_trophy is None
-                start_trophies = channel_info.get("daily_start_trophy")
-                if start_trophies is None:
-                    start_trophies = 0
-                    print(f"No start trophies found for {player.name}, using 0 until next reset")
-
-                trophy_change = player.trophies - start_trophies
+            player = players.get(tag)
+            if not player:
+                logger.warning(f"Could not fetch player {tag} for daily summary")
+                continue
+
+            if not player.league or player.league.id != 29000022:
+                outgoing.append((channel, tag, {"content": f"❌ Daily Summary: {player.name} is no longer in Legend League!"}))
+                continue
+
+            # The tracker still holds the ended day until the reset rolls it over in stage 4
+            state = self.states.get(tag)
+            tracker = state.tracker if state and state.tracker.legend_day == legend_day else None
+            stats = daily_stats.get(tag)
+            if stats is None and tracker:
+                stats = tracker.daily_totals()
+            recent = [
+                change for change in tracker.changes if get_legend_day(change.timestamp) == legend_day
+            ] if tracker else []
 
-                embed = discord.Embed(
-                    title="📊 Daily Trophy Summary",
-                    description=f"Summary for {player.name}",
-                    color=discord.Color.blue()
-                )
+            try:
+                embed = self.build_daily_summary_embed(player, channel_info, current_time, stats, recent)
+                outgoing.append((channel, tag, {"embed": embed}))
+            except Exception as e:
+                logger.error(f"Error generating summary for channel {channel_info['channel_id']}: {e}")
+                logger.debug(f"Channel info: {channel_info}")
+        timings["render"] = time.perf_counter() - stage_start
 
-                # Add note if this was the first summary
-                if channel_info.get("daily_start_trophy") is None:
-                    embed.add_field(
-                        name="Note",
-                        value="⚠️ This is the first summary for this player. Full trophy tracking will begin at next 10 PM reset.",
-                        inline=False
-                    )
+        # Stage 3: send under the outbox's cap on concurrent Discord requests
+        stage_start = time.perf_counter()
+        summarized = {}
 
-                embed.add_field(
-                    name="Trophy Change",
-                    value=f"{'🔺' if trophy_change >= 0 else '🔻'} {trophy_change:+d}",
-                    inline=False
-                )
+        async def send_summary(channel, tag, message):
+            try:
+                await self.outbox.deliver(channel, **message)
+                if "embed" in message:
+                    summarized[tag] = players[tag].trophies
+            except Exception as e:
+                logger.error(f"Error sending daily summary for {tag} to channel {channel.id}: {e}")
 
-                embed.add_field(name="Starting Trophies", value=f"🏆 {start_trophies}", inline=True)
-                embed.add_field(name="Current Trophies", value=f"🏆 {player.trophies}", inline=True)
+        await asyncio.gather(*(send_summary(*item) for item in outgoing))
+        timings["send"] = time.perf_counter() - stage_start
 
-                if player.clan:
-                    embed.add_field(name="Clan", value=f"{player.clan.name}", inline=True)
+        # Stage 4: commit trophy counts in one bulk write, as the new daily starts at the reset
+        stage_start = time.perf_counter()
+        trophy_counts = self.snapshot_start_trophies(tags, players, reset_time) if reset_time else summarized
+        try:
+            await bulk_update_trophy_counts(trophy_counts, daily_reset_time=reset_time)
+        except Exception as e:
+            logger.error(f"Error saving daily summary trophy counts: {e}")
+        timings["db"] = time.perf_counter() - stage_start
+
+        stage_report = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+        logger.info(
+            f"Daily summary sent for {len(summarized)}/{len(tracked_channels)} players in "
+            f"{time.perf_counter() - run_start:.2f}s ({stage_report})"
+        )
+
+    def snapshot_start_trophies(self, tags, players, reset_time: datetime) -> Dict[str, int]:
+        """Start every tracker's new legend day and collect each player's start trophies.
+
+        On time, the counts fetched for the summary are the start trophies. When the reset
+        runs late, players may already have hit in the new day, so the trackers' last counts
+        from before the reset are used instead.
+        """
+        late = datetime.now(self.timezone) - reset_time > timedelta(minutes=1)
+        start_trophies = {}
+        for tag in tags:
+            state = self.states.get(tag)
+            tracker = state.tracker if state and state.tracker.seeded else None
+            player = players.get(tag)
+
+            if tracker:
+                tracker.roll_over(reset_time)
+            if tracker and (late or player is None):
+                start_trophies[tag] = tracker.daily_start
+            elif player is not None:
+                start_trophies[tag] = player.trophies
+            else:
+                continue
+            if tracker:
+                tracker.set_daily_start(start_trophies[tag])
+        return start_trophies
+
+    def build_daily_summary_embed(
+            self, player, channel_info, current_time: datetime, daily_stats=None, recent_changes=()
+    ) -> discord.Embed:
+        """Render the daily summary embed for one tracked player"""
+        # Handle case where daily_start_trophy is None
+        start_trophies = channel_info.get("daily_start_trophy")
+        if start_trophies is None:
+            start_trophies = 0
+            logger.debug(f"No start trophies found for {player.name}, using 0 until next reset")
+
+        trophy_change = player.trophies - start_trophies
+
+        embed = discord.Embed(
+            title="📊 Daily Trophy Summary",
+            description=f"Summary for {player.name}",
+            color=discord.Color.blue()
+        )
+
+        # Add note if this was the first summary
+        if channel_info.get("daily_start_trophy") is None:
+            embed.add_field(
+                name="Note",
+                value="⚠️ This is the first summary for this player. Full trophy tracking will begin at next 10 PM reset.",
+                inline=False
+            )
 
-                if player.league and player.league.icon:
-                    embed.set_thumbnail(url=player.league.icon.url)
+        embed.add_field(
+            name="Trophy Change",
+            value=f"{'🔺' if trophy_change >= 0 else '🔻'} {trophy_change:+d}",
+            inline=False
+        )
+
+        embed.add_field(name="Starting Trophies", value=f"🏆 {start_trophies}", inline=True)
+        embed.add_field(name="Current Trophies", value=f"🏆 {player.trophies}", inline=True)
+
+        if daily_stats:
+            embed.add_field(
+                name="Attacks",
+                value=f"⚔️ {daily_stats.get('attacks', 0)} ({daily_stats.get('attack_stars', 0)}⭐) "
+                      f"+{daily_stats.get('offense_trophies', 0)}",
+                inline=True
+            )
+            embed.add_field(
+                name="Defenses",
+                value=f"🛡️ {daily_stats.get('defenses', 0)} ({daily_stats.get('defense_stars', 0)}⭐) "
+                      f"-{daily_stats.get('defense_trophies', 0)}",
+                inline=True
+            )
 
-                embed.timestamp = current_time
+        if recent_changes:
+            embed.add_field(
+                name="Latest Hits",
+                value="\n".join(
+                    f"{'⚔️' if change.trophy_change > 0 else '🛡️'} {change.trophy_change:+d} "
+                    f"<t:{int(change.timestamp.timestamp())}:t>"
+                    for change in recent_changes
+                ),
+                inline=False
+            )
 
-                await channel.send(embed=embed)
-                print(f"Sent daily summary for {player.name}")
+        if player.clan:
+            embed.add_field(name="Clan", value=f"{player.clan.name}", inline=True)
 
-                # Update daily start trophies only at exactly 10 PM
-                if current_time.hour == 22 and current_time.minute == 0:
-                    await update_trophy_count(tag, player.trophies, is_daily=True)
-                else:
-                    await update_trophy_count(tag, 0, is_daily=True)
+        if player.league and player.league.icon:
+            embed.set_thumbnail(url=player.league.icon.url)
 
-            except Exception as e:
-                print(f"Error generating summary for channel {channel_info['channel_id']}: {e}")
-                print(f"Channel info: {channel_info}")
-                print(f"Current time: {current_time}")
-                if 'player' in locals():
-                    print(f"Player info: {player.__dict__}")
+        embed.timestamp = current_time
+        return embed
 
 
 async def setup(bot):
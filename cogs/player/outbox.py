@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+
+# Discord rejects messages longer than this
+MAX_MESSAGE_LENGTH = 2000
+
+DISCORD_SEND_SECONDS = Histogram("discord_send_seconds", "Discord message send latency, including rate limit waits")
+DISCORD_SEND_ERRORS = Counter("discord_send_errors_total", "Discord message sends that failed")
+
+
+class ChannelOutbox:
+    """Outbound message queue for tracking channels.
+
+    Messages queued for a channel within window seconds are coalesced into as few
+    Discord messages as fit, every send shares one concurrency limit, and queueing
+    waits once max_pending messages are backed up so a flood can't grow memory unbounded.
+    """
+
+    def __init__(
+            self,
+            get_channel: Callable[[int], Any],
+            window: float = 2.0,
+            max_concurrency: int = 10,
+            max_pending: int = 5000
+    ):
+        self.get_channel = get_channel
+        self.window = window
+        self.max_pending = max_pending
+        self.sent = 0
+        self.coalesced = 0
+
+        self._pending: Dict[int, List[str]] = {}
+        self._pending_count = 0
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
+        self._space = asyncio.Condition()
+        self._send_slots = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    async def send(self, channel_id: int, content: str):
+        """Queue a message for a channel, waiting while the outbox is full"""
+        if self._pending_count >= self.max_pending:
+            async with self._space:
+                await self._space.wait_for(lambda: self._pending_count < self.max_pending)
+
+        self._pending.setdefault(channel_id, []).append(content)
+        self._pending_count += 1
+
+        task = self._flush_tasks.get(channel_id)
+        if task is None or task.done():
+            self._flush_tasks[channel_id] = asyncio.create_task(self._flush_channel(channel_id))
+
+    async def deliver(self, channel, **kwargs):
+        """Send one message right away, within the shared concurrency limit"""
+        async with self._send_slots:
+            start = time.perf_counter()
+            try:
+                await channel.send(**kwargs)
+            except Exception:
+                DISCORD_SEND_ERRORS.inc()
+                raise
+            finally:
+                DISCORD_SEND_SECONDS.observe(time.perf_counter() - start)
+        self.sent += 1
+
+    async def close(self):
+        """Send everything still queued without waiting out the coalescing window"""
+        for task in list(self._flush_tasks.values()):
+            task.cancel()
+        self._flush_tasks.clear()
+        await asyncio.gather(*(self._send_pending(channel_id) for channel_id in list(self._pending)))
+
+    async def _flush_channel(self, channel_id: int):
+        # Keep draining while new messages arrive during each window
+        while self._pending.get(channel_id):
+            await asyncio.sleep(self.window)
+            await self._send_pending(channel_id)
+        self._flush_tasks.pop(channel_id, None)
+
+    async def _send_pending(self, channel_id: int):
+        messages = self._pending.pop(channel_id, None)
+        if not messages:
+            return
+
+        await self._release(len(messages))
+        channel = self.get_channel(channel_id)
+        if not channel:
+            return
+
+        chunks = _coalesce(messages)
+        self.coalesced += len(messages) - len(chunks)
+        for content in chunks:
+            try:
+                await self.deliver(channel, content=content)
+            except Exception as e:
+                logger.warning(f"Error sending tracking update to channel {channel_id}: {e}")
+
+    async def _release(self, count: int):
+        self._pending_count -= count
+        async with self._space:
+            self._space.notify_all()
+
+
+def _coalesce(messages: List[str], separator: str = "\n\n") -> List[str]:
+    """Join messages into as few chunks under Discord's length limit as possible"""
+    chunks = []
+    current: Optional[str] = None
+    for message in messages:
+        message = message[:MAX_MESSAGE_LENGTH]
+        if current is None:
+            current = message
+        elif len(current) + len(separator) + len(message) <= MAX_MESSAGE_LENGTH:
+            current += separator + message
+        else:
+            chunks.append(current)
+            current = message
+    if current is not None:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from database.operations import get_last_legend_reset, save_legend_reset
+from utils.legend_day import TIMEZONE, get_legend_day_bounds
+
+logger = logging.getLogger(__name__)
+
+
+class LegendResetScheduler:
+    """Runs on_reset once per legend day, at the 10 PM Phoenix reset.
+
+    The legend day of the last completed reset is stored in Mongo under marker_id.
+    After a restart or an overslept timer, a reset that was missed for the current
+    legend day runs late, exactly once; one that already ran is not repeated. On the
+    very first start there is no marker, so the current day is recorded without running.
+    """
+
+    def __init__(
+            self,
+            marker_id: str,
+            on_reset: Callable[[datetime], Awaitable[None]],
+            max_sleep: float = 300
+    ):
+        self.marker_id = marker_id
+        self.on_reset = on_reset
+        # Long sleeps are split up so wall clock jumps and suspends are noticed
+        self.max_sleep = max_sleep
+        self.last_reset: Optional[date] = None
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_pending()
+                _, next_reset = get_legend_day_bounds()
+                remaining = (next_reset - datetime.now(TIMEZONE)).total_seconds()
+                await asyncio.sleep(min(max(remaining, 0), self.max_sleep))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in legend reset scheduler: {e}")
+                await asyncio.sleep(60)
+
+    async def run_pending(self, now: Optional[datetime] = None):
+        """Run the current legend day's reset if it hasn't run yet"""
+        if not self._loaded:
+            # Read here rather than at start so a failed read is retried by _run
+            self.last_reset = await get_last_legend_reset(self.marker_id)
+            self._loaded = True
+
+        now = now or datetime.now(TIMEZONE)
+        reset_time, _ = get_legend_day_bounds(now)
+        legend_day = reset_time.date()
+        if self.last_reset is not None and self.last_reset >= legend_day:
+            return
+
+        if self.last_reset is None:
+            logger.info(f"No legend reset recorded for {self.marker_id}; the next reset is the first")
+        else:
+            late = now - reset_time
+            if late > timedelta(minutes=1):
+                logger.warning(f"Running the {legend_day} legend reset {late.total_seconds() / 60:.0f} minutes late")
+            await self.on_reset(reset_time)
+
+        await save_legend_reset(self.marker_id, legend_day)
+        self.last_reset = legend_day
@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+import logging
+import time
+import zlib
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from utils.metrics import Histogram
+from utils.player_state import PlayerStateTable
+from utils.trophy_tracker import AdaptivePollInterval
+
+logger = logging.getLogger(__name__)
+
+POLL_LAG_SECONDS = Histogram(
+    "tracking_poll_lag_seconds",
+    "How late scheduled player polls start",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+
+class PollScheduler:
+    """Single polling loop shared by every tracked player.
+
+    Each tag is polled once per interval no matter how many channels track it,
+    and first polls are staggered across the interval so the request rate stays flat.
+    With an interval_policy, each tag's interval adapts to how recently on_result
+    reported a change for it. Subscriptions and schedule live in the player state
+    table, which the cog shares; a tag's state is dropped when its last channel goes.
+    """
+
+    def __init__(
+            self,
+            poll_func: Callable[[str], Awaitable[Any]],
+            on_result: Callable[[str, Any, Tuple[int, ...]], Awaitable[Optional[bool]]],
+            interval: float = 30.0,
+            max_concurrency: int = 20,
+            interval_policy: Optional[AdaptivePollInterval] = None,
+            states: Optional[PlayerStateTable] = None
+    ):
+        self.poll_func = poll_func
+        self.on_result = on_result
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.interval_policy = interval_policy
+
+        self.states = states if states is not None else PlayerStateTable()
+        self._tag_count = 0
+        self._subscription_count = 0
+        self._queue: List[Tuple[float, str]] = []
+        self._poll_tasks: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tag_count(self) -> int:
+        return self._tag_count
+
+    @property
+    def subscription_count(self) -> int:
+        return self._subscription_count
+
+    @property
+    def tags(self) -> Tuple[str, ...]:
+        return tuple(tag for tag, state in self.states.items() if state.channels)
+
+    def is_subscribed(self, tag: str, channel_id: int) -> bool:
+        state = self.states.get(tag)
+        return state is not None and channel_id in state.channels
+
+    def get_channels(self, tag: str) -> Tuple[int, ...]:
+        state = self.states.get(tag)
+        return state.channels if state else ()
+
+    def get_interval(self, tag: str) -> float:
+        state = self.states.get(tag)
+        return state.interval if state and state.interval else self.interval
+
+    def subscribe(self, tag: str, channel_id: int):
+        """Add a channel to a tag, scheduling the tag if it is new"""
+        state = self.states.get_or_create(tag)
+        if channel_id in state.channels:
+            return
+        self._subscription_count += 1
+        if state.channels:
+            state.channels += (channel_id,)
+            return
+
+        state.channels = (channel_id,)
+        self._tag_count += 1
+        # New and resumed tags start hot, since the player may have been active just before
+        state.last_change = time.monotonic()
+        # Spread tags over the interval using a stable offset derived from the tag
+        offset = (zlib.crc32(tag.encode()) % 1000) / 1000 * self.interval
+        self._schedule(tag, time.monotonic() + offset)
+
+    def unsubscribe(self, tag: str, channel_id: int = None):
+        """Remove a channel from a tag, or the whole tag if no channel is given"""
+        state = self.states.get(tag)
+        if state is None or not state.channels:
+            return
+
+        if channel_id is not None:
+            if channel_id not in state.channels:
+                return
+            remaining = tuple(channel for channel in state.channels if channel != channel_id)
+            if remaining:
+                state.channels = remaining
+                self._subscription_count -= 1
+                return
+
+        self._subscription_count -= len(state.channels)
+        self._tag_count -= 1
+        # The heap entry is dropped lazily once it comes due
+        self.states.pop(tag)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._poll_tasks):
+            task.cancel()
+
+    def _schedule(self, tag: str, due: float):
+        self.states.get_or_create(tag).next_poll = due
+        heapq.heappush(self._queue, (due, tag))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                due, tag = self._queue[0]
+                now = time.monotonic()
+                if due > now:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=due - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(self._queue)
+                if not self._is_due(tag, due):
+                    # Stale entry for an unsubscribed or rescheduled tag
+                    continue
+
+                # The tag is rescheduled once its poll completes
+                await self._semaphore.acquire()
+                POLL_LAG_SECONDS.observe(time.monotonic() - due)
+                task = asyncio.create_task(self._poll(tag, due))
+                self._poll_tasks.add(task)
+                task.add_done_callback(self._poll_tasks.discard)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in poll scheduler loop: {e}")
+                await asyncio.sleep(1)
+
+    async def _poll(self, tag: str, due: float):
+        changed = False
+        try:
+            result = await self.poll_func(tag)
+            channels = self.get_channels(tag)
+            if channels:
+                changed = bool(await self.on_result(tag, result, channels))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error polling player {tag}: {e}")
+        finally:
+            self._semaphore.release()
+            if self._is_due(tag, due):
+                self._reschedule(tag, due, changed)
+
+    def _is_due(self, tag: str, due: float) -> bool:
+        """Whether a heap entry is still the tag's current schedule"""
+        state = self.states.get(tag)
+        return state is not None and bool(state.channels) and state.next_poll == due
+
+    def _reschedule(self, tag: str, due: float, changed: bool):
+        now = time.monotonic()
+        state = self.states.get(tag)
+        interval = self.get_interval(tag)
+
+        if self.interval_policy:
+            if changed:
+                state.last_change = now
+            idle_for = now - state.last_change if state.last_change is not None else float("inf")
+            interval = self.interval_policy.next_interval(interval, idle_for)
+            state.interval = interval
+
+        # Keep the tag's phase unless we have fallen a full interval behind
+        next_due = due + interval
+        if next_due <= now:
+            next_due = now + interval
+        self._schedule(tag, next_due)
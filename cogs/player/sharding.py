@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from database.operations import renew_worker_lease, get_live_workers, release_worker_lease, get_tracking_version
+from utils.hash_ring import HashRing
+
+logger = logging.getLogger(__name__)
+
+
+class ShardCoordinator:
+    """Decides which tracked players this worker process owns.
+
+    Every worker renews a lease document in Mongo; the live leases form a
+    consistent hash ring over player tags. When a worker joins or its lease
+    expires the ring is rebuilt and on_rebalance lets the cog pick up or drop players.
+    Tracks and untracks bump a version document, which every heartbeat checks, so
+    players tracked or untracked through other workers are picked up within one
+    heartbeat. on_rebalance also runs every reconcile_interval seconds as a backstop.
+    """
+
+    def __init__(
+            self,
+            worker_id: str,
+            on_rebalance: Callable[[], Awaitable[None]],
+            lease_ttl: float = 30,
+            heartbeat_interval: float = 10,
+            reconcile_interval: float = 300
+    ):
+        self.worker_id = worker_id
+        self.on_rebalance = on_rebalance
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.reconcile_interval = reconcile_interval
+        self._last_rebalance = time.monotonic()
+        self._tracking_version: Optional[int] = None
+        # Until the first heartbeat this worker only knows about itself
+        self.ring = HashRing([worker_id])
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def workers(self):
+        return self.ring.nodes
+
+    def owns(self, tag: str) -> bool:
+        return self.ring.get_node(tag) == self.worker_id
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop heartbeating and release the lease. Safe to call more than once."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        await release_worker_lease(self.worker_id)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in shard heartbeat for worker {self.worker_id}: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def join(self) -> bool:
+        """Renew this worker's lease and rebuild the ring; returns whether the ring changed"""
+        await renew_worker_lease(self.worker_id, self.lease_ttl)
+        workers = set(await get_live_workers())
+        workers.add(self.worker_id)
+
+        if workers == self.ring.nodes:
+            return False
+        logger.info(f"Worker {self.worker_id}: rebalancing across {len(workers)} workers")
+        self.ring = HashRing(workers)
+        return True
+
+    async def heartbeat(self):
+        """Renew the lease, rebalancing when the ring or the tracked players changed, or the reconcile interval passed"""
+        ring_changed = await self.join()
+        # The first heartbeat also catches anything tracked while this worker was resuming
+        version = await get_tracking_version()
+        tracking_changed = version != self._tracking_version
+        self._tracking_version = version
+        reconcile = time.monotonic() - self._last_rebalance >= self.reconcile_interval
+        if ring_changed or tracking_changed or reconcile:
+            self._last_rebalance = time.monotonic()
+            await self.on_rebalance()
@@ -0,0 +1,125 @@
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class TrackingCache:
+    """In-memory copy of player_links and tracking_channels.
+
+    Loaded once at startup and kept coherent by the write functions in
+    database/operations.py (and optionally a change stream), so command
+    lookups don't need a database round-trip. Tracking channels are stored as
+    tuples in tracking_fields order and handed out as fresh dicts. Documents
+    loaded with their _id can also be removed by it, as change stream deletes are.
+    """
+
+    def __init__(self, tracking_fields: Iterable[str]):
+        self.tracking_fields = tuple(tracking_fields)
+        self.loaded = False
+        self._links_by_discord_id: Dict[int, str] = {}
+        self._channels_by_tag: Dict[str, Tuple[Any, ...]] = {}
+        self._discord_id_index = self.tracking_fields.index("discord_id")
+        self._tags_by_discord_id: Dict[int, Set[str]] = {}
+        # Document _ids, both ways, for deletes that only carry the _id
+        self._link_ids: Dict[int, Any] = {}
+        self._discord_ids_by_link_id: Dict[Any, int] = {}
+        self._channel_ids: Dict[str, Any] = {}
+        self._tags_by_channel_id: Dict[Any, str] = {}
+
+    def load(self, links: Iterable[Dict[str, Any]], channels: Iterable[Dict[str, Any]]):
+        self._links_by_discord_id.clear()
+        self._channels_by_tag.clear()
+        self._tags_by_discord_id.clear()
+        self._link_ids.clear()
+        self._discord_ids_by_link_id.clear()
+        self._channel_ids.clear()
+        self._tags_by_channel_id.clear()
+
+        for link in links:
+            self.set_link(link["discord_id"], link["player_tag"], link.get("_id"))
+        for channel in channels:
+            self.upsert_channel(channel)
+        self.loaded = True
+
+    # player_links
+
+    def get_link(self, discord_id: int) -> Optional[str]:
+        return self._links_by_discord_id.get(discord_id)
+
+    def set_link(self, discord_id: int, player_tag: str, document_id: Any = None):
+        self._links_by_discord_id[discord_id] = player_tag
+        if document_id is not None and self._link_ids.get(discord_id) != document_id:
+            self._discord_ids_by_link_id.pop(self._link_ids.get(discord_id), None)
+            self._link_ids[discord_id] = document_id
+            self._discord_ids_by_link_id[document_id] = discord_id
+
+    def remove_link(self, discord_id: int):
+        self._links_by_discord_id.pop(discord_id, None)
+        self._discord_ids_by_link_id.pop(self._link_ids.pop(discord_id, None), None)
+
+    def remove_link_by_id(self, document_id: Any):
+        discord_id = self._discord_ids_by_link_id.pop(document_id, None)
+        if discord_id is not None:
+            self.remove_link(discord_id)
+
+    # tracking_channels
+
+    def get_channel(self, player_tag: str) -> Optional[Dict[str, Any]]:
+        row = self._channels_by_tag.get(player_tag)
+        return self._to_dict(row) if row else None
+
+    def get_channels(self) -> List[Dict[str, Any]]:
+        return [self._to_dict(row) for row in self._channels_by_tag.values()]
+
+    def get_channels_by_discord_id(self, discord_id: int) -> List[Dict[str, Any]]:
+        tags = self._tags_by_discord_id.get(discord_id, ())
+        return [self._to_dict(self._channels_by_tag[tag]) for tag in tags]
+
+    def count_channels_by_discord_id(self, discord_id: int) -> int:
+        return len(self._tags_by_discord_id.get(discord_id, ()))
+
+    def upsert_channel(self, document: Dict[str, Any]):
+        """Insert or replace a tracking_channels document, keeping the discord_id index current"""
+        player_tag = sys.intern(document["player_tag"])
+        document_id = document.get("_id", self._channel_ids.get(player_tag))
+        self.remove_channel(player_tag)
+
+        row = tuple(document.get(field) for field in self.tracking_fields)
+        self._channels_by_tag[player_tag] = row
+        self._tags_by_discord_id.setdefault(row[self._discord_id_index], set()).add(player_tag)
+        if document_id is not None:
+            self._channel_ids[player_tag] = document_id
+            self._tags_by_channel_id[document_id] = player_tag
+
+    def update_channel(self, player_tag: str, fields: Dict[str, Any]):
+        row = self._channels_by_tag.get(player_tag)
+        if row is None:
+            return
+
+        if "discord_id" in fields and fields["discord_id"] != row[self._discord_id_index]:
+            self.upsert_channel({**self._to_dict(row), **fields})
+            return
+
+        self._channels_by_tag[player_tag] = tuple(
+            fields.get(field, value) for field, value in zip(self.tracking_fields, row)
+        )
+
+    def remove_channel_by_id(self, document_id: Any):
+        player_tag = self._tags_by_channel_id.pop(document_id, None)
+        if player_tag is not None:
+            self.remove_channel(player_tag)
+
+    def remove_channel(self, player_tag: str):
+        self._tags_by_channel_id.pop(self._channel_ids.pop(player_tag, None), None)
+        row = self._channels_by_tag.pop(player_tag, None)
+        if row is None:
+            return
+
+        discord_id = row[self._discord_id_index]
+        tags = self._tags_by_discord_id.get(discord_id)
+        if tags is not None:
+            tags.discard(player_tag)
+            if not tags:
+                del self._tags_by_discord_id[discord_id]
+
+    def _to_dict(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        return dict(zip(self.tracking_fields, row))
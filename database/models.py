@@ -14,4 +14,18 @@ class TrackingChannel:
     channel_id: int
     created_at: datetime
     last_trophy_count: int = None
-    daily_start_trophy: int = None
\ No newline at end of file
+    daily_start_trophy: int = None
+
+@dataclass
+class DailyStats:
+    player_tag: str
+    legend_day: str
+    attacks: int = 0
+    defenses: int = 0
+    attack_stars: int = 0
+    defense_stars: int = 0
+    offense_trophies: int = 0
+    defense_trophies: int = 0
+    net_trophies: int = 0
+    start_trophies: int = None
+    end_trophies: int = None
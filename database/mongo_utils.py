@@ -1,8 +1,30 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from utils.config import MONGO_URI
+from utils.metrics import Counter, Histogram
 import asyncio
+import logging
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+MONGO_COMMAND_SECONDS = Histogram("mongo_command_seconds", "MongoDB command latency", ["command"])
+MONGO_COMMAND_FAILURES = Counter("mongo_command_failures_total", "Failed MongoDB commands", ["command"])
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records the latency of every command the driver sends"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name)
+
 
 class MongoManager:
     _instance: Optional[AsyncIOMotorClient] = None
@@ -21,13 +43,14 @@ class MongoManager:
                         minPoolSize=10,
                         maxIdleTimeMS=50000,
                         retryWrites=True,
-                        serverSelectionTimeoutMS=5000
+                        serverSelectionTimeoutMS=5000,
+                        event_listeners=[MongoCommandMetrics()]
                     )
                     # Test connection
                     await cls._instance.admin.command('ping')
-                    print("Successfully connected to MongoDB Atlas!")
+                    logger.info("Successfully connected to MongoDB Atlas!")
                 except Exception as e:
-                    print(f"Error connecting to MongoDB: {e}")
+                    logger.error(f"Error connecting to MongoDB: {e}")
                     raise
 
         return cls._instance
@@ -44,4 +67,4 @@ async def close_database():
     if MongoManager._instance:
         MongoManager._instance.close()
         MongoManager._instance = None
-        print("Closed MongoDB connection")
\ No newline at end of file
+        logger.info("Closed MongoDB connection")
\ No newline at end of file
@@ -1,11 +1,267 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
 import pytz
 from database.mongo_utils import get_database
-from typing import List, Optional, Dict, Any
+from database.cache import TrackingCache
+from utils.legend_day import get_legend_day, get_legend_day_bounds
+from utils.legend_stats import daily_stats_increments
+from utils.metrics import Gauge
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 import pymongo
+from pymongo import UpdateOne
 
-# Define timezone once as a module-level constant
-TIMEZONE = pytz.timezone('America/Phoenix')
+logger = logging.getLogger(__name__)
+
+# Buffered trophy updates are flushed once this many players are pending or after this many seconds
+TROPHY_WRITE_BATCH_SIZE = 500
+TROPHY_WRITE_FLUSH_INTERVAL = 5
+
+# Individual attack/defense events are kept for a little over one legend season
+TROPHY_EVENT_RETENTION = timedelta(days=35)
+
+# Fields returned by the tracking_channels queries; callers never use the rest
+TRACKING_CHANNEL_PROJECTION = {
+    "_id": 0,
+    "discord_id": 1,
+    "player_tag": 1,
+    "channel_id": 1,
+    "last_trophy_count": 1,
+    "daily_start_trophy": 1,
+    "last_daily_reset": 1,
+    "channel_dead": 1
+}
+TRACKED_PLAYER_PROJECTION = {"_id": 0, "player_tag": 1, "channel_id": 1}
+
+# Fields written by update_trophy_count flushes
+TROPHY_COUNT_FIELDS = ("last_trophy_count", "updated_at")
+
+# Write-through copy of player_links and tracking_channels for command lookups
+tracking_cache = TrackingCache(field for field, include in TRACKING_CHANNEL_PROJECTION.items() if include)
+
+
+async def ensure_indexes():
+    """Create every index the bot's queries rely on. Run once at startup."""
+    db = await get_database()
+    indexes = [
+        (db.tracking_channels, [("player_tag", 1)], {"unique": True}),
+        (db.tracking_channels, [("discord_id", 1), ("player_tag", 1)], {}),
+        (db.player_links, [("discord_id", 1)], {"unique": True}),
+        (db.player_links, [("player_tag", 1)], {}),
+        # Expired worker leases are removed by Mongo; live ones are matched by expires_at
+        (db.worker_leases, [("expires_at", 1)], {"expireAfterSeconds": 0}),
+        (db.daily_stats, [("player_tag", 1), ("legend_day", 1)], {"unique": True}),
+        (db.daily_stats, [("legend_day", 1), ("net_trophies", -1)], {}),
+    ]
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Error creating index {keys} on {collection.name}: {e}")
+
+    try:
+        await ensure_trophy_event_collection()
+    except Exception:
+        # Already logged; event history is optional
+        pass
+
+
+async def load_tracking_cache():
+    """Load player_links and tracking_channels into the in-memory cache"""
+    db = await get_database()
+    try:
+        # With _ids, so change stream deletes can find their entries
+        links = await db.player_links.find({}, {"_id": 1, "discord_id": 1, "player_tag": 1}).to_list(length=None)
+        channels = await db.tracking_channels.find(
+            {}, {**TRACKING_CHANNEL_PROJECTION, "_id": 1}
+        ).to_list(length=None)
+        tracking_cache.load(links, channels)
+        logger.info(f"Cached {len(links)} player links and {len(channels)} tracking channels")
+    except Exception as e:
+        logger.error(f"Error loading tracking cache: {e}")
+        raise
+
+
+async def watch_tracking_changes():
+    """Apply writes made by other processes to the cache. Requires a replica set."""
+    db = await get_database()
+    try:
+        # Trophy count flushes are most of the writes, and would each cost a document lookup
+        updated_fields = {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}}
+        trophy_count_only = {"$and": [
+            {"$eq": ["$operationType", "update"]},
+            {"$setIsSubset": [{"$map": {"input": updated_fields, "in": "$$this.k"}}, list(TROPHY_COUNT_FIELDS)]}
+        ]}
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": ["player_links", "tracking_channels"]},
+            "$expr": {"$not": [trophy_count_only]}
+        }}]
+        async with db.watch(pipeline, full_document="updateLookup") as stream:
+            async for change in stream:
+                _apply_change(change)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Tracking cache change stream stopped: {e}")
+
+
+def _apply_change(change: Dict[str, Any]):
+    collection = change["ns"]["coll"]
+    document = change.get("fullDocument")
+
+    if change["operationType"] == "delete":
+        # Deletes only carry the _id
+        document_id = change["documentKey"]["_id"]
+        if collection == "player_links":
+            tracking_cache.remove_link_by_id(document_id)
+        else:
+            tracking_cache.remove_channel_by_id(document_id)
+    elif document is None:
+        return
+    elif collection == "player_links":
+        tracking_cache.set_link(document["discord_id"], document["player_tag"], document["_id"])
+    elif collection == "tracking_channels":
+        tracking_cache.upsert_channel(document)
+
+
+def _merge_stats_update(older: Dict[str, Dict[str, Any]], newer: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine two daily_stats upserts for the same player and legend day into one"""
+    increments = dict(older["$inc"])
+    for field, value in newer["$inc"].items():
+        increments[field] = increments.get(field, 0) + value
+    return {
+        "$inc": increments,
+        "$set": {**older["$set"], **newer["$set"]},
+        "$setOnInsert": {**newer["$setOnInsert"], **older["$setOnInsert"]}
+    }
+
+
+class TrophyWriteBuffer:
+    """Write-behind buffer for tracking_channels updates, trophy events and daily_stats rollups.
+
+    Updates are merged per player (rollups per player and legend day) and flushed as
+    unordered bulk writes (events as one insert_many) when the buffer fills up or the
+    flush interval elapses.
+    """
+
+    def __init__(self, max_size: int = TROPHY_WRITE_BATCH_SIZE, flush_interval: float = TROPHY_WRITE_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._stats: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer_task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._pending) + len(self._events) + len(self._stats)
+
+    def add(self, player_tag: str, fields: Dict[str, Any]):
+        """Queue a $set for a player, merging with any update already pending"""
+        self._pending.setdefault(player_tag, {}).update(fields)
+        self._schedule_flush()
+
+    def add_event(self, event: Dict[str, Any]):
+        """Queue a trophy event document for insertion"""
+        self._events.append(event)
+        self._schedule_flush()
+
+    def add_stats(self, player_tag: str, legend_day: str, update: Dict[str, Dict[str, Any]]):
+        """Queue a daily_stats upsert, merging counters with any rollup already pending"""
+        key = (player_tag, legend_day)
+        pending = self._stats.get(key)
+        self._stats[key] = _merge_stats_update(pending, update) if pending else update
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._flush_periodically())
+
+        if len(self) >= self.max_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Write every pending update and rollup in one bulk write each and every pending event in one insert"""
+        async with self._flush_lock:
+            if not len(self):
+                return
+
+            batch, self._pending = self._pending, {}
+            events, self._events = self._events, []
+            stats, self._stats = self._stats, {}
+            db = await get_database()
+            error = None
+
+            if batch:
+                operations = [
+                    UpdateOne({"player_tag": player_tag}, {"$set": fields})
+                    for player_tag, fields in batch.items()
+                ]
+                try:
+                    await db.tracking_channels.bulk_write(operations, ordered=False)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(operations)} buffered trophy updates: {e}")
+                    # Requeue the batch without overwriting anything newer queued meanwhile
+                    for player_tag, fields in batch.items():
+                        self._pending[player_tag] = {**fields, **self._pending.get(player_tag, {})}
+                    error = e
+
+            if events:
+                try:
+                    await db.trophy_events.insert_many(events, ordered=False)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(events)} buffered trophy events: {e}")
+                    if isinstance(e, pymongo.errors.BulkWriteError):
+                        # Only the events that were rejected are retried
+                        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                        events = [event for index, event in enumerate(events) if index in failed]
+                    self._events = events + self._events
+                    error = e
+
+            if stats:
+                keys = list(stats)
+                operations = [
+                    UpdateOne({"player_tag": player_tag, "legend_day": legend_day}, stats[(player_tag, legend_day)], upsert=True)
+                    for player_tag, legend_day in keys
+                ]
+                try:
+                    await db.daily_stats.bulk_write(operations, ordered=False)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(operations)} buffered daily stats: {e}")
+                    if isinstance(e, pymongo.errors.BulkWriteError):
+                        # Counters are incremented, so only the rejected upserts may be retried
+                        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                        keys = [key for index, key in enumerate(keys) if index in failed]
+                    for key in keys:
+                        pending = self._stats.get(key)
+                        self._stats[key] = _merge_stats_update(stats[key], pending) if pending else stats[key]
+                    error = e
+
+            if error:
+                raise error
+
+    async def close(self):
+        """Stop the flush timer and write out everything still pending"""
+        if self._timer_task:
+            self._timer_task.cancel()
+            self._timer_task = None
+        await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Already logged; the batch stays queued for the next attempt
+                pass
+
+
+_trophy_buffer = TrophyWriteBuffer()
+
+TROPHY_BUFFER_PENDING = Gauge("trophy_write_buffer_pending", "Trophy updates, events and rollups waiting to be flushed")
+TROPHY_BUFFER_PENDING.set_function(lambda: len(_trophy_buffer))
 
 async def save_player_link(discord_id: int, player_tag: str):
     """Save player link to database"""
@@ -23,31 +279,29 @@ async def save_player_link(discord_id: int, player_tag: str):
             },
             upsert=True
         )
+        tracking_cache.set_link(discord_id, player_tag)
     except Exception as e:
-        print(f"Error saving player link: {e}")
+        logger.error(f"Error saving player link: {e}")
         raise
 
 async def get_player_by_discord_id(discord_id: int) -> Optional[str]:
     """Get player tag by Discord ID"""
+    if tracking_cache.loaded:
+        return tracking_cache.get_link(discord_id)
+
     db = await get_database()
     try:
-        result = await db.player_links.find_one({"discord_id": discord_id})
+        result = await db.player_links.find_one({"discord_id": discord_id}, {"_id": 0, "player_tag": 1})
         return result["player_tag"] if result else None
     except Exception as e:
-        print(f"Error getting player by discord ID: {e}")
+        logger.error(f"Error getting player by discord ID: {e}")
         return None
 
 async def save_tracking_channel(discord_id: int, player_tag: str, channel_id: int):
     """Save tracking channel information"""
     db = await get_database()
     try:
-        # Create index for player_tag if it doesn't exist
-        await db.tracking_channels.create_index("player_tag", unique=True)
-
-        # Get current time in Phoenix timezone
-        current_time = datetime.now(TIMEZONE)
-
-        await db.tracking_channels.insert_one({
+        document = {
             "discord_id": discord_id,
             "player_tag": player_tag,
             "channel_id": channel_id,
@@ -55,8 +309,11 @@ async def save_tracking_channel(discord_id: int, player_tag: str, channel_id: in
             "updated_at": datetime.utcnow(),
             "last_trophy_count": None,
             "daily_start_trophy": None,
-            "last_daily_reset": None
-        })
+            "last_daily_reset": None,
+            "channel_dead": False
+        }
+        await db.tracking_channels.insert_one(document)
+        tracking_cache.upsert_channel(document)
     except pymongo.errors.DuplicateKeyError:
         # Update existing channel if player already being tracked
         await db.tracking_channels.update_one(
@@ -64,72 +321,196 @@ async def save_tracking_channel(discord_id: int, player_tag: str, channel_id: in
             {
                 "$set": {
                     "channel_id": channel_id,
+                    "channel_dead": False,
                     "updated_at": datetime.utcnow()
                 }
             }
         )
+        tracking_cache.update_channel(player_tag, {"channel_id": channel_id, "channel_dead": False})
     except Exception as e:
-        print(f"Error saving tracking channel: {e}")
+        logger.error(f"Error saving tracking channel: {e}")
         raise
+    await bump_tracking_version()
 
 async def get_tracking_channels() -> List[Dict[str, Any]]:
     """Get all tracking channels"""
+    if tracking_cache.loaded:
+        return tracking_cache.get_channels()
+
     db = await get_database()
     try:
-        cursor = db.tracking_channels.find({})
+        cursor = db.tracking_channels.find({}, TRACKING_CHANNEL_PROJECTION)
         return await cursor.to_list(length=None)
     except Exception as e:
-        print(f"Error getting tracking channels: {e}")
+        logger.error(f"Error getting tracking channels: {e}")
         return []
 
-async def update_trophy_count(player_tag: str, trophy_count: int, is_daily: bool = False):
-    """Update trophy count for player"""
-    db = await get_database()
-    try:
-        current_time = datetime.now(TIMEZONE)
+async def update_trophy_count(player_tag: str, trophy_count: int):
+    """Queue a trophy count update for player; it is written in the next bulk flush.
+
+    Daily start trophies are only set by the legend reset, through bulk_update_trophy_counts.
+    """
+    update = {
+        "updated_at": datetime.utcnow(),
+        "last_trophy_count": trophy_count
+    }
 
+    tracking_cache.update_channel(player_tag, update)
+    _trophy_buffer.add(player_tag, update)
+
+
+async def bulk_update_trophy_counts(trophy_counts: Dict[str, int], daily_reset_time: datetime = None):
+    """Update trophy counts for many players and flush them in a single bulk write.
+
+    When daily_reset_time is given, the counts also become each player's daily start.
+    """
+    for player_tag, trophy_count in trophy_counts.items():
         update = {
             "updated_at": datetime.utcnow(),
             "last_trophy_count": trophy_count
         }
-
-        # Only update daily_start_trophy if it's exactly 10 PM and is_daily is True
-        if is_daily and current_time.hour == 22 and current_time.minute == 0:
+        if daily_reset_time is not None:
             update.update({
                 "daily_start_trophy": trophy_count,
-                "last_daily_reset": current_time
+                "last_daily_reset": daily_reset_time
             })
-        # if is_daily and current_time.hour == 17 and current_time.minute == 50:
-        #     update.update({
-        #         "daily_start_trophy": trophy_count,
-        #         "last_daily_reset": current_time
-        #     })
+        tracking_cache.update_channel(player_tag, update)
+        _trophy_buffer.add(player_tag, update)
 
-        await db.tracking_channels.update_one(
-            {"player_tag": player_tag},
-            {"$set": update}
-        )
+    await flush_trophy_updates()
+
+
+async def flush_trophy_updates():
+    """Write all buffered trophy updates to the database"""
+    await _trophy_buffer.flush()
+
+
+async def close_trophy_updates():
+    """Flush buffered trophy updates before shutdown"""
+    try:
+        await _trophy_buffer.close()
     except Exception as e:
-        print(f"Error updating trophy count: {e}")
+        logger.error(f"Error flushing trophy updates on shutdown: {e}")
+
+async def ensure_trophy_event_collection():
+    """Create the trophy_events time-series collection if it does not exist"""
+    db = await get_database()
+    try:
+        existing = await db.list_collection_names(filter={"name": "trophy_events"})
+        if not existing:
+            await db.create_collection(
+                "trophy_events",
+                timeseries={
+                    "timeField": "timestamp",
+                    "metaField": "player_tag",
+                    "granularity": "minutes"
+                },
+                expireAfterSeconds=int(TROPHY_EVENT_RETENTION.total_seconds())
+            )
+        await db.trophy_events.create_index([("player_tag", 1), ("timestamp", 1)])
+    except Exception as e:
+        logger.error(f"Error creating trophy event collection: {e}")
         raise
 
+
+async def record_trophy_event(player_tag: str, old_count: int, new_count: int, timestamp: datetime = None):
+    """Queue an attack/defense event for the trophy event store and roll it into the player's daily stats"""
+    timestamp = timestamp or datetime.utcnow()
+    delta = new_count - old_count
+    _trophy_buffer.add_event({
+        "timestamp": timestamp,
+        "player_tag": player_tag,
+        "type": "attack" if delta > 0 else "defense",
+        "old_count": old_count,
+        "new_count": new_count,
+        "delta": delta
+    })
+
+    # Event timestamps are naive UTC
+    legend_day = get_legend_day(pytz.utc.localize(timestamp) if timestamp.tzinfo is None else timestamp)
+    _trophy_buffer.add_stats(player_tag, legend_day.isoformat(), {
+        "$inc": daily_stats_increments(delta),
+        "$set": {"end_trophies": new_count, "updated_at": datetime.utcnow()},
+        "$setOnInsert": {"start_trophies": old_count}
+    })
+
+
+async def get_daily_stats(player_tags: Iterable[str], legend_day: date) -> Dict[str, Dict[str, Any]]:
+    """Get the daily_stats rollups for a legend day, keyed by player tag"""
+    db = await get_database()
+    try:
+        cursor = db.daily_stats.find(
+            {"legend_day": legend_day.isoformat(), "player_tag": {"$in": list(player_tags)}},
+            {"_id": 0}
+        )
+        return {stats["player_tag"]: stats async for stats in cursor}
+    except Exception as e:
+        logger.error(f"Error getting daily stats: {e}")
+        return {}
+
+
+async def get_trophy_events(player_tag: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Get a player's trophy events in [start, end), oldest first"""
+    db = await get_database()
+    try:
+        cursor = db.trophy_events.find(
+            {"player_tag": player_tag, "timestamp": {"$gte": start, "$lt": end}},
+            {"_id": 0}
+        ).sort("timestamp", 1)
+        return await cursor.to_list(length=None)
+    except Exception as e:
+        logger.error(f"Error getting trophy events: {e}")
+        return []
+
+
+async def get_legend_day_events(player_tag: str, now: datetime = None) -> List[Dict[str, Any]]:
+    """Get a player's trophy events for the legend day containing now"""
+    start, end = get_legend_day_bounds(now)
+    return await get_trophy_events(player_tag, start, end)
+
 async def get_tracking_channel(player_tag: str) -> Optional[Dict[str, Any]]:
     """Get tracking channel info for a specific player"""
+    if tracking_cache.loaded:
+        return tracking_cache.get_channel(player_tag)
+
     db = await get_database()
     try:
-        return await db.tracking_channels.find_one({"player_tag": player_tag})
+        return await db.tracking_channels.find_one({"player_tag": player_tag}, TRACKING_CHANNEL_PROJECTION)
     except Exception as e:
-        print(f"Error getting tracking channel: {e}")
+        logger.error(f"Error getting tracking channel: {e}")
         return None
 
-async def remove_tracking_channel(player_tag: str):
-    """Remove tracking channel from database"""
+async def remove_tracking_channel(player_tag: str, discord_id: int = None):
+    """Remove tracking channel from database, optionally only if discord_id owns it"""
     db = await get_database()
+    query = {"player_tag": player_tag}
+    if discord_id is not None:
+        query["discord_id"] = discord_id
     try:
-        await db.tracking_channels.delete_one({"player_tag": player_tag})
+        result = await db.tracking_channels.delete_one(query)
+        if result.deleted_count:
+            tracking_cache.remove_channel(player_tag)
     except Exception as e:
-        print(f"Error removing tracking channel: {e}")
+        logger.error(f"Error removing tracking channel: {e}")
         raise
+    if result.deleted_count:
+        await bump_tracking_version()
+
+async def mark_tracking_channels_dead(player_tags: List[str]):
+    """Flag tracking entries whose Discord channel no longer exists so they aren't resumed"""
+    if not player_tags:
+        return
+
+    db = await get_database()
+    try:
+        await db.tracking_channels.update_many(
+            {"player_tag": {"$in": player_tags}},
+            {"$set": {"channel_dead": True, "updated_at": datetime.utcnow()}}
+        )
+        for player_tag in player_tags:
+            tracking_cache.update_channel(player_tag, {"channel_dead": True})
+    except Exception as e:
+        logger.error(f"Error marking tracking channels dead: {e}")
 
 async def get_player_by_tag(tag: str) -> Optional[Dict[str, Any]]:
     """Get player info by tag"""
@@ -138,28 +519,119 @@ async def get_player_by_tag(tag: str) -> Optional[Dict[str, Any]]:
         result = await db.player_links.find_one({"player_tag": tag})
         return result
     except Exception as e:
-        print(f"Error getting player by tag: {e}")
+        logger.error(f"Error getting player by tag: {e}")
         return None
 
 
 async def get_tracked_player_count(discord_id: int) -> int:
     """Get the number of players being tracked by a Discord user"""
+    if tracking_cache.loaded:
+        return tracking_cache.count_channels_by_discord_id(discord_id)
+
     db = await get_database()
     try:
-        cursor = db.tracking_channels.find({"discord_id": discord_id})
-        tracked_players = await cursor.to_list(length=None)
-        return len(tracked_players)
+        return await db.tracking_channels.count_documents({"discord_id": discord_id})
     except Exception as e:
-        print(f"Error getting tracked player count: {e}")
+        logger.error(f"Error getting tracked player count: {e}")
         return 0
 
 
 async def get_tracked_players_by_discord_id(discord_id: int) -> List[Dict[str, Any]]:
     """Get all tracked players for a Discord user"""
+    if tracking_cache.loaded:
+        return tracking_cache.get_channels_by_discord_id(discord_id)
+
     db = await get_database()
     try:
-        cursor = db.tracking_channels.find({"discord_id": discord_id})
+        cursor = db.tracking_channels.find({"discord_id": discord_id}, TRACKED_PLAYER_PROJECTION)
         return await cursor.to_list(length=None)
     except Exception as e:
-        print(f"Error getting tracked players: {e}")
-        return []
\ No newline at end of file
+        logger.error(f"Error getting tracked players: {e}")
+        return []
+
+
+async def renew_worker_lease(worker_id: str, ttl: float):
+    """Create or extend this worker's tracking lease"""
+    db = await get_database()
+    now = datetime.utcnow()
+    try:
+        await db.worker_leases.update_one(
+            {"_id": worker_id},
+            {
+                "$set": {"expires_at": now + timedelta(seconds=ttl), "renewed_at": now},
+                "$setOnInsert": {"started_at": now}
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error renewing worker lease: {e}")
+        raise
+
+
+async def get_live_workers() -> List[str]:
+    """Get the ids of all workers holding an unexpired lease"""
+    db = await get_database()
+    try:
+        cursor = db.worker_leases.find({"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1})
+        return [lease["_id"] async for lease in cursor]
+    except Exception as e:
+        logger.error(f"Error getting live workers: {e}")
+        raise
+
+
+async def release_worker_lease(worker_id: str):
+    """Give up this worker's lease so the others take over its players immediately"""
+    db = await get_database()
+    try:
+        await db.worker_leases.delete_one({"_id": worker_id})
+    except Exception as e:
+        logger.error(f"Error releasing worker lease: {e}")
+
+
+async def bump_tracking_version():
+    """Record that the set of tracked players changed, so sharded workers rebalance on their next heartbeat"""
+    db = await get_database()
+    try:
+        await db.shard_state.update_one(
+            {"_id": "tracking_channels"},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error bumping tracking version: {e}")
+
+
+async def get_tracking_version() -> int:
+    """Get the version bumped by every track and untrack"""
+    db = await get_database()
+    try:
+        state = await db.shard_state.find_one({"_id": "tracking_channels"}, {"version": 1})
+    except Exception as e:
+        logger.error(f"Error getting tracking version: {e}")
+        raise
+    return state["version"] if state else 0
+
+
+async def get_last_legend_reset(marker_id: str) -> Optional[date]:
+    """Get the legend day of the last daily reset that completed under marker_id"""
+    db = await get_database()
+    try:
+        marker = await db.legend_resets.find_one({"_id": marker_id})
+    except Exception as e:
+        logger.error(f"Error getting last legend reset: {e}")
+        raise
+    return date.fromisoformat(marker["legend_day"]) if marker else None
+
+
+async def save_legend_reset(marker_id: str, legend_day: date):
+    """Record that the daily reset for legend_day has completed"""
+    db = await get_database()
+    try:
+        await db.legend_resets.update_one(
+            {"_id": marker_id},
+            {"$set": {"legend_day": legend_day.isoformat(), "reset_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error saving legend reset: {e}")
+        raise
@@ -1,5 +1,8 @@
 import asyncio
+import hashlib
+import json
 import os
+import time
 
 import discord
 from discord.ext import commands
@@ -12,8 +15,16 @@ from dotenv import load_dotenv
 
 from services.coc_api import close_coc_client
 from services.potoken_generator import start_token_manager
-from utils.config import DISCORD_TOKEN
+from utils.config import (
+    DISCORD_TOKEN, MONGO_CHANGE_STREAMS, METRICS_HOST, METRICS_PORT,
+    LOOP_MONITOR_INTERVAL, SLOW_CALLBACK_THRESHOLD, USE_UVLOOP, PROFILE_DIR
+)
+from utils.metrics import MetricsServer
+from utils.loop_monitor import LoopMonitor, loop_implementation
+from utils.profiler import Profiler
+from utils.logging_config import setup_logging, stop_logging
 from database.mongo_utils import close_database
+from database.operations import close_trophy_updates, ensure_indexes, load_tracking_cache, watch_tracking_changes
 
 # Load environment variables
 load_dotenv()
@@ -21,8 +32,12 @@ load_dotenv()
 LAVALINK_URI = os.getenv('LAVALINK_URI')
 LAVALINK_PASSWORD = os.getenv('LAVALINK_PASSWORD')
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Hashes of the last synced command trees, so unchanged trees are not re-synced on every start
+COMMAND_SYNC_STATE_FILE = os.getenv('COMMAND_SYNC_STATE_FILE', '.command_sync_state.json')
+GUILD_SYNC_CONCURRENCY = 5
+
+# Log records are formatted and written by a background thread
+setup_logging()
 
 
 class ClashBot(commands.Bot):
@@ -39,10 +54,79 @@ class ClashBot(commands.Bot):
 
         # Store token manager
         self.token_manager = None
+        self.music_setup_task = None
+        self.cache_watch_task = None
+        self.guild_sync_done = False
+        self.metrics_server = None
+        self.loop_monitor = LoopMonitor(interval=LOOP_MONITOR_INTERVAL, slow_callback_threshold=SLOW_CALLBACK_THRESHOLD)
+        self.profiler = Profiler(PROFILE_DIR)
 
     async def setup_hook(self):
         """Called when the bot is setting up"""
-        # Start Lavalink setup
+        timings = {}
+
+        self.loop_monitor.start()
+        logging.info(f"Running on {loop_implementation()}")
+
+        # SIGUSR1 starts a profile and the next SIGUSR1 writes it out, for when Discord itself is unresponsive
+        try:
+            self.loop.add_signal_handler(signal.SIGUSR1, self.profiler.toggle)
+        except (AttributeError, NotImplementedError):
+            pass
+
+        if METRICS_PORT:
+            try:
+                self.metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT)
+                await self.metrics_server.start()
+                logging.info(f"Serving metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except Exception as e:
+                logging.error(f"Failed to start metrics server: {e}")
+                self.metrics_server = None
+
+        # Music services connect in the background so they never delay the bot
+        self.music_setup_task = asyncio.create_task(self.setup_music_services())
+
+        # Create database indexes once instead of on every write
+        phase_start = time.perf_counter()
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            logging.error(f"Failed to create database indexes: {e}")
+        timings["indexes"] = time.perf_counter() - phase_start
+
+        # Serve player links and tracking channels from memory
+        phase_start = time.perf_counter()
+        try:
+            await load_tracking_cache()
+            if MONGO_CHANGE_STREAMS:
+                self.cache_watch_task = asyncio.create_task(watch_tracking_changes())
+        except Exception as e:
+            logging.error(f"Failed to load tracking cache, falling back to database reads: {e}")
+        timings["cache"] = time.perf_counter() - phase_start
+
+        # Load cogs
+        phase_start = time.perf_counter()
+        await self.load_extension("cogs.player.commands")
+        await self.load_extension("cogs.music.commands")  # Load music commands
+        await self.load_extension("cogs.admin.commands")
+        timings["cogs"] = time.perf_counter() - phase_start
+
+        # Sync slash commands only when the command tree changed
+        phase_start = time.perf_counter()
+        try:
+            if await self.sync_commands():
+                logging.info("Slash commands synced!")
+            else:
+                logging.info("Slash commands unchanged, skipping sync")
+        except Exception as e:
+            logging.error(f"Failed to sync slash commands: {e}")
+        timings["sync"] = time.perf_counter() - phase_start
+
+        logging.info("Startup phases: " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()))
+
+    async def setup_music_services(self):
+        """Start the token manager and connect to Lavalink"""
+        phase_start = time.perf_counter()
         try:
             # Start token manager
             self.token_manager = await start_token_manager()
@@ -56,39 +140,80 @@ class ClashBot(commands.Bot):
                 password=LAVALINK_PASSWORD
             )
             await wavelink.Pool.connect(client=self, nodes=[node])
-            logging.info("Wavelink node connected successfully!")
+            logging.info(f"Wavelink node connected successfully in {time.perf_counter() - phase_start:.2f}s!")
         except Exception as e:
             logging.error(f"Failed to setup music services: {e}")
 
-        # Load cogs
-        await self.load_extension("cogs.player.commands")
-        await self.load_extension("cogs.music.commands")  # Load music commands
+    def _command_tree_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+            key=lambda command: (command.get("type", 1), command["name"])
+        )
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _load_sync_state(self) -> dict:
+        try:
+            with open(COMMAND_SYNC_STATE_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sync_state(self, state: dict):
+        try:
+            with open(COMMAND_SYNC_STATE_FILE, "w") as f:
+                json.dump(state, f)
+        except OSError as e:
+            logging.error(f"Failed to save command sync state: {e}")
 
-        # Sync slash commands
-        await self.tree.sync()
-        logging.info("Slash commands synced!")
+    async def sync_commands(self, guild: Optional[discord.abc.Snowflake] = None) -> bool:
+        """Sync the command tree if its hash differs from the last sync. Returns whether it synced."""
+        scope = f"{self.application_id}:{guild.id if guild else 'global'}"
+        tree_hash = self._command_tree_hash(guild)
+
+        state = self._load_sync_state()
+        if state.get(scope) == tree_hash:
+            return False
+
+        await self.tree.sync(guild=guild)
+        # Re-read so concurrent guild syncs don't drop each other's entries
+        state = self._load_sync_state()
+        state[scope] = tree_hash
+        self._save_sync_state(state)
+        return True
 
     async def on_ready(self):
-        print(f'Logged in as {self.user} (ID: {self.user.id})')
-        print('------')
+        logging.info(f'Logged in as {self.user} (ID: {self.user.id})')
 
-        # Additional sync to ensure commands are registered
-        for guild in self.guilds:
-            try:
-                await self.tree.sync(guild=guild)
-                logging.info(f"Synced commands for guild: {guild.name}")
-            except Exception as e:
-                logging.error(f"Failed to sync commands for guild {guild.name}: {e}")
+        # on_ready also fires on reconnects; guild commands only need checking once
+        if self.guild_sync_done:
+            return
+        self.guild_sync_done = True
+
+        sync_start = time.perf_counter()
+        sync_slots = asyncio.Semaphore(GUILD_SYNC_CONCURRENCY)
+
+        async def sync_guild(guild):
+            async with sync_slots:
+                try:
+                    if await self.sync_commands(guild=guild):
+                        logging.info(f"Synced commands for guild: {guild.name}")
+                except Exception as e:
+                    logging.error(f"Failed to sync commands for guild {guild.name}: {e}")
+
+        await asyncio.gather(*(sync_guild(guild) for guild in self.guilds))
+        logging.info(f"Checked guild commands for {len(self.guilds)} guilds in {time.perf_counter() - sync_start:.2f}s")
 
     async def close(self):
         """Cleanup when bot shuts down"""
-        print("Bot is shutting down...")
+        logging.info("Bot is shutting down...")
 
-        # Cancel all tracking tasks
+        # Stop the trophy tracking scheduler
         for cog in self.cogs.values():
-            if hasattr(cog, 'tracking_tasks'):
-                for task in cog.tracking_tasks.values():
-                    task.cancel()
+            if hasattr(cog, 'change_detector'):
+                await cog.change_detector.stop()
+            # Release the shard lease while the database is still open
+            if getattr(cog, 'shard_coordinator', None):
+                await cog.shard_coordinator.stop()
 
         try:
             # Disconnect from all voice channels
@@ -101,16 +226,26 @@ class ClashBot(commands.Bot):
         # Close COC client
         await close_coc_client()
 
-        # Close database connection
+        if self.music_setup_task:
+            self.music_setup_task.cancel()
+        if self.cache_watch_task:
+            self.cache_watch_task.cancel()
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        self.loop_monitor.stop()
+
+        # Write out buffered trophy updates, then close database connection
+        await close_trophy_updates()
         await close_database()
 
         # Close bot connection
         await super().close()
-        print("Cleanup complete")
+        logging.info("Cleanup complete")
 
 
 def handle_exit(signum, frame):
-    print("\nReceived exit signal. Initiating shutdown...")
+    logging.info("Received exit signal. Initiating shutdown...")
     sys.exit(0)
 
 
@@ -124,14 +259,21 @@ async def main():
     try:
         await bot.start(DISCORD_TOKEN)
     except KeyboardInterrupt:
-        print("Received keyboard interrupt, shutting down...")
+        logging.info("Received keyboard interrupt, shutting down...")
         await bot.close()
     except Exception as e:
-        print(f"Error occurred: {e}")
+        logging.error(f"Error occurred: {e}")
         await bot.close()
     finally:
         await bot.close()
+        stop_logging()
 
 
 if __name__ == "__main__":
+    if USE_UVLOOP:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
     asyncio.run(main())
\ No newline at end of file
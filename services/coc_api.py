@@ -1,60 +1,379 @@
 import coc
-from utils.config import COC_EMAIL, COC_PASSWORD
+from utils.config import (
+    COC_ACCOUNTS, COC_KEY_COUNT, COC_REQUESTS_PER_KEY, COC_MAX_IN_FLIGHT, COC_CACHE_TTL, COC_CACHE_SIZE
+)
 import asyncio
+import logging
 import aiohttp
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from utils.metrics import Counter, Histogram
 
-# Global client instance
-_coc_client = None
+logger = logging.getLogger(__name__)
+
+# Global client pool instance
+_coc_pool = None
 _lock = asyncio.Lock()
 
+# How long a key stays out of rotation after the API rejects it
+RATE_LIMITED_COOLDOWN = 30
+FORBIDDEN_COOLDOWN = 300
+
+COC_REQUEST_SECONDS = Histogram("coc_api_request_seconds", "CoC API request latency", ["method"])
+COC_REQUESTS = Counter("coc_api_requests_total", "CoC API requests by result status", ["method", "status"])
+
+
+class TokenBucket:
+    """Token bucket rate limiter for CoC API requests"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        # Waiters are served in arrival order while holding the lock
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CocKey:
+    """A single API key with its own client, rate limiter and usage counters"""
+
+    def __init__(self, name: str, client: coc.Client, rate: float):
+        self.name = name
+        self.client = client
+        self.rate = rate
+        self.limiter = TokenBucket(rate)
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.disabled_until = 0.0
+        self.disabled_reason = None
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._utilization = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.disabled_until
+
+    @property
+    def load(self) -> float:
+        """Queued and in-flight requests relative to the key's per-second budget"""
+        return self.in_flight / self.rate
+
+    @property
+    def utilization(self) -> float:
+        """Share of the key's budget used over the last full minute"""
+        self._roll_window()
+        return self._utilization
+
+    def record_request(self):
+        self.requests += 1
+        self._roll_window()
+        self._window_requests += 1
+
+    def disable(self, seconds: float, reason: str):
+        self.disabled_until = time.monotonic() + seconds
+        self.disabled_reason = reason
+
+    def _roll_window(self):
+        elapsed = time.monotonic() - self._window_start
+        if elapsed >= 60:
+            self._utilization = self._window_requests / (elapsed * self.rate)
+            self._window_start = time.monotonic()
+            self._window_requests = 0
+
+
+class CocClientPool:
+    """Pool of CoC API keys across one or more developer accounts.
+
+    Every key gets its own client so requests can be routed to the least-loaded
+    key, and keys rejected with 403/429 are taken out of rotation for a while.
+    """
+
+    def __init__(self, accounts, keys_per_account: int, requests_per_key: float):
+        self.accounts = accounts
+        self.keys_per_account = keys_per_account
+        self.requests_per_key = requests_per_key
+        self.keys: List[CocKey] = []
+
+    async def login(self):
+        for account_index, (email, password) in enumerate(self.accounts):
+            for key_index in range(self.keys_per_account):
+                # Distinct key names make each client claim its own key on the account
+                key_name = f"Trophy Tracker Bot {key_index + 1}"
+                client = coc.Client(
+                    key_names=key_name,
+                    key_count=1,
+                    throttle_limit=int(self.requests_per_key)
+                )
+                try:
+                    await client.login(email=email, password=password)
+                except Exception as e:
+                    logger.error(f"Failed to log in CoC key '{key_name}' for account {account_index + 1}: {e}")
+                    await client.close()
+                    continue
+                self.keys.append(CocKey(f"account{account_index + 1}/{key_name}", client, self.requests_per_key))
+
+        if not self.keys:
+            raise RuntimeError("No CoC API keys could be initialized")
+
+    async def close(self):
+        for key in self.keys:
+            await key.client.close()
+        self.keys = []
+
+    def _pick_key(self) -> CocKey:
+        available = [key for key in self.keys if key.available]
+        if available:
+            return min(available, key=lambda key: key.load)
+        # Every key is cooling down; use the one that recovers first
+        return min(self.keys, key=lambda key: key.disabled_until)
+
+    async def request(self, method: str, *args, **kwargs) -> Any:
+        """Call a coc.Client method on the least-loaded key, failing over on 403/429"""
+        failures = 0
+        while True:
+            key = self._pick_key()
+            key.in_flight += 1
+            try:
+                await key.limiter.acquire()
+                if not key.available and any(other.available for other in self.keys):
+                    # The key was taken out of rotation while this request waited for it
+                    continue
+                key.record_request()
+                return await self._call(key, method, *args, **kwargs)
+            except coc.NotFound:
+                raise
+            except coc.HTTPException as e:
+                key.errors += 1
+                status = getattr(e, "status", None)
+                was_available = key.available
+                if status == 429:
+                    key.disable(RATE_LIMITED_COOLDOWN, "rate limited")
+                elif status == 403:
+                    key.disable(FORBIDDEN_COOLDOWN, "forbidden")
+                else:
+                    raise
+                if was_available:
+                    logger.warning(f"CoC key {key.name} returned {status}, taking it out of rotation")
+                failures += 1
+                if failures >= len(self.keys):
+                    raise
+            finally:
+                key.in_flight -= 1
+
+    async def _call(self, key: CocKey, method: str, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            return await getattr(key.client, method)(*args, **kwargs)
+        except coc.HTTPException as e:
+            status = str(getattr(e, "status", None) or "error")
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            COC_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method)
+            COC_REQUESTS.inc(method=method, status=status)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key usage report"""
+        now = time.monotonic()
+        return [
+            {
+                "name": key.name,
+                "in_flight": key.in_flight,
+                "requests": key.requests,
+                "errors": key.errors,
+                "utilization": key.utilization,
+                "available": key.available,
+                "disabled_for": max(0.0, key.disabled_until - now),
+                "disabled_reason": key.disabled_reason if not key.available else None,
+            }
+            for key in self.keys
+        ]
+
 
-async def get_coc_client():
-    """Get or create COC client with rate limiting"""
-    global _coc_client
+class PlayerCache:
+    """LRU cache of API lookups with per-entry TTL and single-flight coalescing.
+
+    Concurrent lookups of the same key share one request instead of each
+    going to the API.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """Return a cached value, joining an in-flight fetch for the same key if there is one"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _store(self, key: str, task: asyncio.Task):
+        self._pending.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        value = task.result()
+        if value is None:
+            return
+
+        # Never serve a value past the API's own cache-control max-age
+        ttl = self.ttl
+        max_age = getattr(value, "_response_retry", None)
+        if max_age:
+            ttl = min(ttl, max_age)
+        self.set(key, value, ttl)
+
+
+# Caps concurrent requests across the whole pool
+_request_slots = asyncio.Semaphore(COC_MAX_IN_FLIGHT)
+_player_cache = PlayerCache(COC_CACHE_SIZE, COC_CACHE_TTL)
+
+
+async def get_coc_pool() -> CocClientPool:
+    """Get or create the COC client pool"""
+    global _coc_pool
 
     async with _lock:
-        if _coc_client is None:
+        if _coc_pool is None:
             try:
-                _coc_client = coc.Client(key_names="Trophy Tracker Bot", key_count=1)
-                await _coc_client.login(
-                    email=COC_EMAIL,
-                    password=COC_PASSWORD
-                )
+                pool = CocClientPool(COC_ACCOUNTS, COC_KEY_COUNT, COC_REQUESTS_PER_KEY)
+                await pool.login()
+                _coc_pool = pool
             except Exception as e:
-                print(f"Failed to initialize COC client: {e}")
+                logger.error(f"Failed to initialize COC client pool: {e}")
                 raise
 
-    return _coc_client
+    return _coc_pool
+
+
+def get_coc_key_stats() -> List[Dict[str, Any]]:
+    """Get per-key utilization for the COC client pool"""
+    return _coc_pool.stats() if _coc_pool else []
 
 
 async def close_coc_client():
-    """Close the COC client"""
-    global _coc_client
-    if _coc_client:
-        await _coc_client.close()
-        _coc_client = None
+    """Close every client in the COC pool"""
+    global _coc_pool
+    if _coc_pool:
+        await _coc_pool.close()
+        _coc_pool = None
 
 
-async def get_player_info(tag: str):
-    """Get player info with error handling and rate limiting"""
-    try:
-        client = await get_coc_client()
+def normalize_tag(tag: str) -> str:
+    """Normalize a player tag to the API's canonical form (e.g. #2PP)"""
+    return coc.utils.correct_tag(tag)
 
-        # Add small delay between requests
-        await asyncio.sleep(0.1)
+
+def get_player_cache_stats() -> Dict[str, int]:
+    """Get hit/miss counters for the player lookup cache"""
+    return {
+        "size": len(_player_cache),
+        "hits": _player_cache.hits,
+        "misses": _player_cache.misses,
+        "coalesced": _player_cache.coalesced,
+    }
+
+
+async def pooled_request(method: str, *args, **kwargs) -> Any:
+    """Call a coc.Client method through the shared key pool, its rate limiters and the in-flight cap"""
+    pool = await get_coc_pool()
+    async with _request_slots:
+        return await pool.request(method, *args, **kwargs)
+
+
+async def _fetch_player(tag: str):
+    """Fetch a player from the API with error handling and rate limiting"""
+    try:
+        pool = await get_coc_pool()
 
         try:
-            return await client.get_player(tag)
-        except coc.exceptions.NotFound:
-            print(f"Player {tag} not found")
+            async with _request_slots:
+                return await pool.request("get_player", tag)
+        except coc.NotFound:
+            logger.info(f"Player {tag} not found")
             return None
-        except aiohttp.ClientResponseError as e:
-            print(f"API Error for {tag}: {e}")
+        except (coc.HTTPException, aiohttp.ClientResponseError) as e:
+            logger.warning(f"API Error for {tag}: {e}")
             return None
         except Exception as e:
-            print(f"Unexpected error getting player {tag}: {e}")
+            logger.error(f"Unexpected error getting player {tag}: {e}")
             return None
 
     except Exception as e:
-        print(f"Error with COC client: {e}")
-        return None
\ No newline at end of file
+        logger.error(f"Error with COC client: {e}")
+        return None
+
+
+async def get_player_info(tag: str, use_cache: bool = True):
+    """Get player info, served from the short-lived cache when possible"""
+    tag = normalize_tag(tag)
+    if not use_cache:
+        _player_cache.invalidate(tag)
+    return await _player_cache.get_or_fetch(tag, lambda: _fetch_player(tag))
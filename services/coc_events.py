@@ -0,0 +1,137 @@
+import coc
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from services.coc_api import pooled_request
+from utils.config import COC_ACCOUNTS, COC_REQUESTS_PER_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class PooledEventsClient(coc.EventsClient):
+    """EventsClient whose player lookups draw on the shared CoC key pool's budget.
+
+    Only the library's own background pollers (maintenance, season end, raids)
+    use the key this client logs in with, a few requests a minute.
+    """
+
+    async def get_player(self, player_tag: str, cls=coc.Player, load_game_data: bool = None, **kwargs):
+        return await pooled_request("get_player", player_tag, cls=cls, load_game_data=load_game_data, **kwargs)
+
+
+class EventsTrophyDetector:
+    """Trophy change detection built on coc.py's EventsClient.
+
+    Tracked tags are registered with the library once; its player updater
+    polls them through the shared key pool and only trophy deltas reach the cog.
+    Exposes the same subscription interface as the cog's PollScheduler.
+    """
+
+    def __init__(
+            self,
+            on_change: Callable[[str, int, Any, Tuple[int, ...], Any], Awaitable[None]],
+            interval: float = 30.0
+    ):
+        self.on_change = on_change
+        self.interval = interval
+        self.client: Optional[coc.EventsClient] = None
+
+        self._subscribers: Dict[str, Set[int]] = {}
+        # Normalized API tag -> tag as stored in the database
+        self._tags: Dict[str, str] = {}
+        self._login_task: Optional[asyncio.Task] = None
+
+    @property
+    def tag_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def subscription_count(self) -> int:
+        return sum(len(channels) for channels in self._subscribers.values())
+
+    @property
+    def tags(self) -> Tuple[str, ...]:
+        return tuple(self._subscribers)
+
+    def is_subscribed(self, tag: str, channel_id: int) -> bool:
+        return channel_id in self._subscribers.get(tag, ())
+
+    def get_channels(self, tag: str) -> Tuple[int, ...]:
+        return tuple(self._subscribers.get(tag, ()))
+
+    def subscribe(self, tag: str, channel_id: int):
+        """Add a channel to a tag, registering the tag with the events client if it is new"""
+        channels = self._subscribers.get(tag)
+        if channels is not None:
+            channels.add(channel_id)
+            return
+
+        self._subscribers[tag] = {channel_id}
+        normalized = coc.utils.correct_tag(tag)
+        self._tags[normalized] = tag
+        if self.client:
+            self.client.add_player_updates(normalized)
+
+    def unsubscribe(self, tag: str, channel_id: int = None):
+        """Remove a channel from a tag, or the whole tag if no channel is given"""
+        channels = self._subscribers.get(tag)
+        if channels is None:
+            return
+
+        if channel_id is not None:
+            channels.discard(channel_id)
+            if channels:
+                return
+
+        del self._subscribers[tag]
+        normalized = coc.utils.correct_tag(tag)
+        self._tags.pop(normalized, None)
+        if self.client:
+            self.client.remove_player_updates(normalized)
+
+    def start(self):
+        if self._login_task is None:
+            self._login_task = asyncio.create_task(self._login())
+
+    async def stop(self):
+        """Stop the updater and close the events client. Safe to call more than once."""
+        if self._login_task:
+            self._login_task.cancel()
+            self._login_task = None
+        if self.client:
+            client, self.client = self.client, None
+            await client.close()
+
+    async def _login(self):
+        email, password = COC_ACCOUNTS[0]
+        client = PooledEventsClient(
+            key_names="Trophy Tracker Events",
+            key_count=1,
+            throttle_limit=int(COC_REQUESTS_PER_KEY)
+        )
+        try:
+            await client.login(email=email, password=password)
+        except Exception as e:
+            logger.error(f"Failed to initialize COC events client: {e}")
+            await client.close()
+            return
+
+        @coc.PlayerEvents.trophies(retry_interval=int(self.interval))
+        async def on_trophies(old_player, player):
+            await self._dispatch(old_player, player)
+
+        client.add_events(on_trophies)
+        if self._tags:
+            client.add_player_updates(*self._tags)
+        self.client = client
+
+    async def _dispatch(self, old_player, player):
+        tag = self._tags.get(player.tag)
+        channels = self.get_channels(tag) if tag else ()
+        if not channels:
+            return
+
+        try:
+            await self.on_change(tag, old_player.trophies, player, channels, old_player)
+        except Exception as e:
+            logger.error(f"Error dispatching trophy change for {tag}: {e}")
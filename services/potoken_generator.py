@@ -6,10 +6,6 @@ from datetime import datetime, timedelta
 import os
 import socket
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -39,11 +35,11 @@ class TokenManager:
                         async with session.get(self.token_generator_url) as response:
                             if response.status == 200:
                                 response_text = await response.text()
-                                logger.info(f"Raw response: {response_text}")
+                                logger.debug(f"Raw response: {response_text}")
 
                                 try:
                                     data = json.loads(response_text)
-                                    logger.info(f"Parsed response: {data}")
+                                    logger.debug(f"Parsed response: {data}")
 
                                     # Handle both possible key names
                                     po_token = data.get('potoken') or data.get('po_token')
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import cogs.player.reset as reset
+from cogs.player.reset import LegendResetScheduler
+from utils.legend_day import TIMEZONE
+
+RESET = TIMEZONE.localize(datetime(2026, 3, 10, 22))
+
+
+@pytest.fixture
+def markers(monkeypatch):
+    """Stand-in for the legend_resets collection"""
+    stored = {}
+
+    async def get_last_legend_reset(marker_id):
+        return stored.get(marker_id)
+
+    async def save_legend_reset(marker_id, legend_day):
+        stored[marker_id] = legend_day
+
+    monkeypatch.setattr(reset, "get_last_legend_reset", get_last_legend_reset)
+    monkeypatch.setattr(reset, "save_legend_reset", save_legend_reset)
+    return stored
+
+
+def _scheduler():
+    runs = []
+
+    async def on_reset(reset_time):
+        runs.append(reset_time)
+
+    return LegendResetScheduler("default", on_reset), runs
+
+
+def test_first_start_records_the_day_without_running(markers):
+    scheduler, runs = _scheduler()
+    asyncio.run(scheduler.run_pending(RESET + timedelta(hours=1)))
+    assert runs == []
+    assert markers["default"] == date(2026, 3, 10)
+
+
+def test_runs_once_per_legend_day(markers):
+    markers["default"] = date(2026, 3, 9)
+    scheduler, runs = _scheduler()
+
+    async def run():
+        await scheduler.run_pending(RESET + timedelta(seconds=5))
+        await scheduler.run_pending(RESET + timedelta(minutes=5))
+        await scheduler.run_pending(RESET + timedelta(hours=23, minutes=59))
+        await scheduler.run_pending(RESET + timedelta(days=1, seconds=5))
+
+    asyncio.run(run())
+    assert runs == [RESET, RESET + timedelta(days=1)]
+    assert markers["default"] == date(2026, 3, 11)
+
+
+def test_missed_reset_runs_late(markers):
+    markers["default"] = date(2026, 3, 9)
+    scheduler, runs = _scheduler()
+    asyncio.run(scheduler.run_pending(RESET + timedelta(hours=3)))
+    # The reset covers the day that started at the missed 22:00, not the time it ran
+    assert runs == [RESET]
+    assert markers["default"] == date(2026, 3, 10)
+
+
+def test_restart_does_not_repeat_a_completed_reset(markers):
+    markers["default"] = date(2026, 3, 9)
+    scheduler, runs = _scheduler()
+    asyncio.run(scheduler.run_pending(RESET + timedelta(seconds=5)))
+
+    restarted, restarted_runs = _scheduler()
+    asyncio.run(restarted.run_pending(RESET + timedelta(minutes=10)))
+    assert runs == [RESET]
+    assert restarted_runs == []
+
+
+def test_failed_marker_read_is_retried(markers, monkeypatch):
+    markers["default"] = date(2026, 3, 9)
+    get_marker = reset.get_last_legend_reset
+    failures = [RuntimeError("mongo unavailable")]
+
+    async def flaky_get_last_legend_reset(marker_id):
+        if failures:
+            raise failures.pop()
+        return await get_marker(marker_id)
+
+    monkeypatch.setattr(reset, "get_last_legend_reset", flaky_get_last_legend_reset)
+    scheduler, runs = _scheduler()
+    with pytest.raises(RuntimeError):
+        asyncio.run(scheduler.run_pending(RESET + timedelta(seconds=5)))
+    asyncio.run(scheduler.run_pending(RESET + timedelta(minutes=1)))
+    assert runs == [RESET]
@@ -0,0 +1,60 @@
+from utils.legend_stats import daily_stats_increments, decompose_trophy_change, stars_for_trophy_change
+
+
+def test_single_attack_is_one_hit():
+    assert decompose_trophy_change(32, 1) == [32]
+
+
+def test_merged_attacks_split_evenly():
+    assert decompose_trophy_change(30, 2) == [15, 15]
+    assert decompose_trophy_change(31, 2) == [16, 15]
+    assert decompose_trophy_change(80, 2) == [40, 40]
+
+
+def test_merged_attacks_above_two_stars_include_a_three_star():
+    assert decompose_trophy_change(72, 2) == [40, 32]
+    assert decompose_trophy_change(66, 2) == [40, 26]
+
+
+def test_merged_attacks_without_a_valid_split_stay_merged():
+    # 75 = 40 + 35, and no single hit gains 33-39 trophies
+    assert decompose_trophy_change(75, 2) == [75]
+
+
+def test_losses_without_attacks_become_fewest_even_defenses():
+    assert decompose_trophy_change(-40, 0) == [-40]
+    assert decompose_trophy_change(-41, 0) == [-21, -20]
+    assert decompose_trophy_change(-80, 0) == [-40, -40]
+    # A single 35 trophy defense is impossible, so it takes two
+    assert decompose_trophy_change(-35, 0) == [-18, -17]
+
+
+def test_held_defenses_add_zero_trophy_hits():
+    assert decompose_trophy_change(40, 1, held_defenses=1) == [40, 0]
+    assert decompose_trophy_change(0, 0, held_defenses=2) == [0, 0]
+
+
+def test_unexplained_deltas_are_kept_whole():
+    # A gain larger than the attacks can explain, or mixed attacks and defenses
+    assert decompose_trophy_change(90, 2) == [90]
+    assert decompose_trophy_change(-10, 1) == [-10]
+    # Counters reset at the end of a season
+    assert decompose_trophy_change(25, -30) == [25]
+
+
+def test_split_hits_each_map_to_a_star_count():
+    for attacks in range(1, 9):
+        for total in range(attacks, 40 * attacks + 1):
+            hits = decompose_trophy_change(total, attacks)
+            assert sum(hits) == total
+            assert hits == [total] or all(stars_for_trophy_change(hit) for hit in hits)
+    for losses in range(1, 321):
+        hits = decompose_trophy_change(-losses, 0)
+        assert sum(hits) == -losses
+        assert all(stars_for_trophy_change(hit) for hit in hits)
+
+
+def test_daily_stats_increments():
+    assert daily_stats_increments(40) == {"attacks": 1, "attack_stars": 3, "offense_trophies": 40, "net_trophies": 40}
+    assert daily_stats_increments(-16) == {"defenses": 1, "defense_stars": 2, "defense_trophies": 16, "net_trophies": -16}
+    assert daily_stats_increments(0)["defense_stars"] == 0
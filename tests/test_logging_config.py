@@ -0,0 +1,32 @@
+import json
+import logging
+import queue
+
+from utils.logging_config import JsonFormatter, LocalQueueHandler
+
+
+def _queued_record(log_queue: queue.SimpleQueue) -> logging.LogRecord:
+    logger = logging.getLogger("tests.logging_config")
+    logger.propagate = False
+    handler = LocalQueueHandler(log_queue)
+    logger.addHandler(handler)
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed to poll %s", "#ABC")
+    finally:
+        logger.removeHandler(handler)
+    return log_queue.get_nowait()
+
+
+def test_queued_records_keep_exception_info():
+    record = _queued_record(queue.SimpleQueue())
+    assert record.exc_info is not None
+    assert record.getMessage() == "Failed to poll #ABC"
+
+
+def test_json_formatter_reports_queued_exceptions():
+    entry = json.loads(JsonFormatter().format(_queued_record(queue.SimpleQueue())))
+    assert entry["message"] == "Failed to poll #ABC"
+    assert "ValueError: boom" in entry["exception"]
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from cogs.player.commands import PlayerCommands
+from utils.legend_day import TIMEZONE
+from utils.player_state import PlayerStateTable
+
+RESET = TIMEZONE.localize(datetime(2026, 3, 10, 22))
+
+
+def _cog(states):
+    return SimpleNamespace(states=states, timezone=TIMEZONE)
+
+
+def test_late_reset_starts_trackers_seeded_after_it_from_their_seed_count():
+    # Restarted at 22:30: the first poll seeds the tracker before the late reset writes the new start
+    states = PlayerStateTable()
+    tracker = states.get_or_create("#P").tracker
+    tracker.seed(
+        5000, 10, 4, daily_start=4900, daily_start_at=RESET - timedelta(days=1), now=RESET + timedelta(minutes=30)
+    )
+
+    players = {"#P": SimpleNamespace(trophies=5040)}
+    start_trophies = PlayerCommands.snapshot_start_trophies(_cog(states), ["#P"], players, RESET)
+    assert start_trophies == {"#P": 5000}
+    assert tracker.daily_start == 5000
+
+
+def test_late_reset_uses_the_last_count_from_before_the_reset():
+    states = PlayerStateTable()
+    tracker = states.get_or_create("#P").tracker
+    tracker.seed(4900, 10, 4, now=RESET - timedelta(hours=2))
+    tracker.update_count(4940, 11, 4, now=RESET - timedelta(hours=1))
+    # The first hit after the reset rolls the day over from the count before it
+    tracker.update_count(4972, 12, 4, now=RESET + timedelta(minutes=20))
+
+    players = {"#P": SimpleNamespace(trophies=4972)}
+    start_trophies = PlayerCommands.snapshot_start_trophies(_cog(states), ["#P"], players, RESET)
+    assert start_trophies == {"#P": 4940}
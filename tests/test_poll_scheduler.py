@@ -0,0 +1,34 @@
+import asyncio
+
+from cogs.player.scheduler import PollScheduler
+from utils.trophy_tracker import AdaptivePollInterval
+
+
+async def _noop(*args):
+    return None
+
+
+def test_new_subscriptions_poll_at_the_minimum_interval():
+    async def run():
+        scheduler = PollScheduler(_noop, _noop, interval=30, interval_policy=AdaptivePollInterval(15, 180))
+        scheduler.subscribe("#P", 1)
+        for _ in range(3):
+            scheduler._reschedule("#P", 0.0, changed=False)
+        return scheduler.get_interval("#P")
+
+    assert asyncio.run(run()) == 15
+
+
+def test_idle_players_back_off():
+    async def run():
+        scheduler = PollScheduler(
+            _noop, _noop, interval=30, interval_policy=AdaptivePollInterval(15, 180, hot_window=0)
+        )
+        scheduler.subscribe("#P", 1)
+        intervals = []
+        for _ in range(3):
+            scheduler._reschedule("#P", 0.0, changed=False)
+            intervals.append(scheduler.get_interval("#P"))
+        return intervals
+
+    assert asyncio.run(run()) == [45, 67.5, 101.25]
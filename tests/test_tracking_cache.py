@@ -0,0 +1,60 @@
+from bson import ObjectId
+
+import database.operations as operations
+from database.cache import TrackingCache
+
+FIELDS = ("discord_id", "player_tag", "channel_id", "last_trophy_count")
+
+
+def _channel(document_id, tag="#P", channel_id=10):
+    return {"_id": document_id, "discord_id": 1, "player_tag": tag, "channel_id": channel_id, "last_trophy_count": None}
+
+
+def test_channels_are_removed_by_document_id():
+    cache = TrackingCache(FIELDS)
+    document_id = ObjectId()
+    cache.load([], [_channel(document_id)])
+    cache.remove_channel_by_id(document_id)
+    assert cache.get_channel("#P") is None
+    assert cache.get_channels_by_discord_id(1) == []
+
+
+def test_stale_delete_does_not_remove_a_retracked_channel():
+    cache = TrackingCache(FIELDS)
+    old_id, new_id = ObjectId(), ObjectId()
+    cache.load([], [_channel(old_id)])
+    # Untracked and tracked again by this process before the old delete arrives on the stream
+    cache.remove_channel("#P")
+    cache.upsert_channel(_channel(new_id, channel_id=11))
+    cache.remove_channel_by_id(old_id)
+    assert cache.get_channel("#P")["channel_id"] == 11
+
+
+def test_updates_keep_the_document_id():
+    cache = TrackingCache(FIELDS)
+    document_id = ObjectId()
+    cache.load([], [_channel(document_id)])
+    cache.update_channel("#P", {"discord_id": 2})
+    cache.remove_channel_by_id(document_id)
+    assert cache.get_channel("#P") is None
+
+
+def test_links_are_removed_by_document_id():
+    cache = TrackingCache(FIELDS)
+    document_id = ObjectId()
+    cache.load([{"_id": document_id, "discord_id": 1, "player_tag": "#P"}], [])
+    cache.remove_link_by_id(document_id)
+    assert cache.get_link(1) is None
+
+
+def test_change_stream_deletes_use_the_document_key(monkeypatch):
+    cache = TrackingCache(FIELDS)
+    document_id = ObjectId()
+    cache.load([], [_channel(document_id)])
+    monkeypatch.setattr(operations, "tracking_cache", cache)
+    operations._apply_change({
+        "operationType": "delete",
+        "ns": {"db": "coc_bot", "coll": "tracking_channels"},
+        "documentKey": {"_id": document_id}
+    })
+    assert cache.get_channel("#P") is None
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from utils.legend_day import TIMEZONE
+from utils.trophy_tracker import TrophyTracker
+
+# Noon on a legend day that started at 10 PM the evening before
+NOON = TIMEZONE.localize(datetime(2026, 3, 10, 12))
+
+
+def test_history_keeps_the_latest_changes_in_order():
+    tracker = TrophyTracker(capacity=3)
+    tracker.seed(5000, 0, 0, now=NOON)
+    for attack in range(1, 6):
+        tracker.update_count(5000 + attack * 10, attack, 0, now=NOON + timedelta(minutes=attack))
+    assert [change.new_count for change in tracker.changes] == [5030, 5040, 5050]
+
+
+def test_daily_totals_count_split_hits():
+    tracker = TrophyTracker()
+    tracker.seed(5000, 10, 4, now=NOON)
+    tracker.update_count(5030, 12, 4, now=NOON)
+    tracker.update_count(4990, 12, 4, now=NOON)
+    assert tracker.daily_totals() == {
+        "attacks": 2, "defenses": 1, "attack_stars": 2, "defense_stars": 3,
+        "offense_trophies": 30, "defense_trophies": 40,
+    }
+    assert tracker.get_daily_change() == -10
+
+
+def test_reset_rolls_the_day_over():
+    tracker = TrophyTracker()
+    tracker.seed(5000, 0, 0, now=NOON)
+    tracker.update_count(5040, 1, 0, now=NOON)
+    legend_day = tracker.legend_day
+
+    tracker.update_count(5072, 2, 0, now=NOON + timedelta(hours=11))
+    assert tracker.legend_day == legend_day + timedelta(days=1)
+    assert tracker.daily_start == 5040
+    assert tracker.daily_totals()["attacks"] == 1
+    assert tracker.get_daily_change() == 32
+
+
+def test_seed_ignores_a_daily_start_from_before_the_reset():
+    reset = TIMEZONE.localize(datetime(2026, 3, 10, 22))
+    tracker = TrophyTracker()
+    tracker.seed(5000, daily_start=4900, daily_start_at=reset - timedelta(days=1), now=reset + timedelta(minutes=30))
+    assert tracker.daily_start == 5000
+
+
+def test_seed_keeps_the_current_days_daily_start():
+    reset = TIMEZONE.localize(datetime(2026, 3, 10, 22))
+    tracker = TrophyTracker()
+    # Stored as naive UTC, as Mongo returns it
+    stored_at = reset.astimezone(timezone.utc).replace(tzinfo=None)
+    tracker.seed(5000, daily_start=4900, daily_start_at=stored_at, now=reset + timedelta(minutes=30))
+    assert tracker.daily_start == 4900
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,5 +11,81 @@ DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 COC_EMAIL = os.getenv('COC_EMAIL')
 COC_PASSWORD = os.getenv('COC_PASSWORD')
 
+
+def _parse_accounts(value):
+    """Parse "email:password,email:password" into (email, password) pairs"""
+    accounts = []
+    for entry in (value or '').split(','):
+        email, sep, password = entry.strip().partition(':')
+        if sep:
+            accounts.append((email, password))
+    return accounts
+
+
+# Developer accounts for the CoC key pool, defaulting to the single account above
+COC_ACCOUNTS = _parse_accounts(os.getenv('COC_ACCOUNTS')) or [(COC_EMAIL, COC_PASSWORD)]
+
+# Clash of Clans API request budget (COC_KEY_COUNT keys are used per account)
+COC_KEY_COUNT = int(os.getenv('COC_KEY_COUNT', '1'))
+COC_REQUESTS_PER_KEY = float(os.getenv('COC_REQUESTS_PER_KEY', '30'))
+COC_MAX_IN_FLIGHT = int(os.getenv('COC_MAX_IN_FLIGHT', '10'))
+
+# Player lookup cache (entries also expire at the API's cache-control max-age)
+COC_CACHE_TTL = float(os.getenv('COC_CACHE_TTL', '30'))
+COC_CACHE_SIZE = int(os.getenv('COC_CACHE_SIZE', '10000'))
+
+# Trophy change detection: "poll" (shared poll scheduler) or "events" (coc.py EventsClient)
+TRACKING_BACKEND = os.getenv('TRACKING_BACKEND', 'poll').lower()
+
+# Adaptive poll intervals (seconds): active players are polled at the minimum, idle ones back off to the maximum.
+# TRACKING_INTERVAL spreads the first polls of new and resumed players and is the events backend's poll interval.
+TRACKING_INTERVAL = float(os.getenv('TRACKING_INTERVAL', '30'))
+TRACKING_MIN_INTERVAL = float(os.getenv('TRACKING_MIN_INTERVAL', '15'))
+TRACKING_MAX_INTERVAL = float(os.getenv('TRACKING_MAX_INTERVAL', '180'))
+
+# Recent trophy changes kept in memory per tracked player
+TROPHY_HISTORY_SIZE = int(os.getenv('TROPHY_HISTORY_SIZE', '8'))
+
+# Tracking channel messages: updates within the window are coalesced, sends share one concurrency limit
+TRACKING_MESSAGE_WINDOW = float(os.getenv('TRACKING_MESSAGE_WINDOW', '2'))
+TRACKING_MESSAGE_BACKLOG = int(os.getenv('TRACKING_MESSAGE_BACKLOG', '5000'))
+DISCORD_SEND_CONCURRENCY = int(os.getenv('DISCORD_SEND_CONCURRENCY', '10'))
+
+# Sharded tracking: each worker process polls only the players it owns on a consistent hash ring.
+# A worker's ring position and legend reset marker are keyed by WORKER_ID, so sharded workers need one that survives restarts.
+SHARDING_ENABLED = os.getenv('SHARDING_ENABLED', 'false').lower() == 'true'
+if SHARDING_ENABLED and not os.getenv('WORKER_ID'):
+    raise RuntimeError("SHARDING_ENABLED requires a WORKER_ID that stays the same across restarts")
+WORKER_ID = os.getenv('WORKER_ID') or f"{socket.gethostname()}-{os.getpid()}"
+SHARD_LEASE_TTL = float(os.getenv('SHARD_LEASE_TTL', '30'))
+SHARD_HEARTBEAT_INTERVAL = float(os.getenv('SHARD_HEARTBEAT_INTERVAL', '10'))
+# Without ring changes, workers re-read tracking channels this often to pick up tracks made through other workers
+SHARD_RECONCILE_INTERVAL = float(os.getenv('SHARD_RECONCILE_INTERVAL', '300'))
+
+# Prometheus metrics endpoint (http://METRICS_HOST:METRICS_PORT/metrics); port 0 disables it
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
+# Logging: LOG_FORMAT is "json" or "text"; LOG_LEVELS and LOG_SAMPLE_RATES take "logger=value,logger=value"
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', 'discord=WARNING,discord.client=INFO')
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'cogs.player.scheduler=0.1,services.coc_events=0.1')
+
+# Event loop watchdog: lag is sampled every LOOP_MONITOR_INTERVAL seconds and callbacks
+# running longer than SLOW_CALLBACK_THRESHOLD seconds are reported. USE_UVLOOP installs uvloop if it is available,
+# which turns off slow callback reporting.
+LOOP_MONITOR_INTERVAL = float(os.getenv('LOOP_MONITOR_INTERVAL', '0.5'))
+SLOW_CALLBACK_THRESHOLD = float(os.getenv('SLOW_CALLBACK_THRESHOLD', '0.1'))
+USE_UVLOOP = os.getenv('USE_UVLOOP', 'false').lower() == 'true'
+
+# Runtime profiling: /profile and SIGUSR1 write cProfile and tracemalloc results to PROFILE_DIR.
+# A /profile session runs for at most PROFILE_MAX_SECONDS.
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '300'))
+
 # MongoDB connection string
-MONGO_URI = os.getenv('MONGO_URI')
\ No newline at end of file
+MONGO_URI = os.getenv('MONGO_URI')
+
+# Keep the in-memory tracking cache in sync with other processes via a change stream (needs a replica set)
+MONGO_CHANGE_STREAMS = os.getenv('MONGO_CHANGE_STREAMS', 'false').lower() == 'true'
\ No newline at end of file
@@ -0,0 +1,29 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+import pytz
+
+# Legend League days roll over at 10 PM Phoenix time (05:00 UTC)
+TIMEZONE = pytz.timezone('America/Phoenix')
+RESET_HOUR = 22
+
+
+def get_legend_day(now: Optional[datetime] = None) -> date:
+    """Get the calendar date on which the current legend day started"""
+    now = (now or datetime.now(TIMEZONE)).astimezone(TIMEZONE)
+    if now.hour < RESET_HOUR:
+        return now.date() - timedelta(days=1)
+    return now.date()
+
+
+def get_legend_day_bounds(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Get the (start, end) of the legend day containing now"""
+    day = get_legend_day(now)
+    start = TIMEZONE.localize(datetime(day.year, day.month, day.day, RESET_HOUR))
+    next_day = day + timedelta(days=1)
+    end = TIMEZONE.localize(datetime(next_day.year, next_day.month, next_day.day, RESET_HOUR))
+    return start, end
+
+
+def get_next_reset(now: Optional[datetime] = None) -> datetime:
+    """Get the time of the next legend day reset"""
+    return get_legend_day_bounds(now)[1]
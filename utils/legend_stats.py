@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+
+
+def stars_for_trophy_change(trophy_change: int) -> Optional[int]:
+    """Get the stars behind a single legend attack or defense, or None if the change is not one hit"""
+    trophy_change = abs(trophy_change)
+    if trophy_change == 40:
+        return 3
+    if 16 <= trophy_change <= 32:
+        return 2
+    if 1 <= trophy_change <= 15:
+        return 1
+    return None
+
+
+def daily_stats_increments(trophy_change: int) -> Dict[str, int]:
+    """Get the daily_stats counters one attack or defense adds to a player's legend day"""
+    stars = stars_for_trophy_change(trophy_change) or 0
+    if trophy_change > 0:
+        return {
+            "attacks": 1,
+            "attack_stars": stars,
+            "offense_trophies": trophy_change,
+            "net_trophies": trophy_change
+        }
+    return {
+        "defenses": 1,
+        "defense_stars": stars,
+        "defense_trophies": -trophy_change,
+        "net_trophies": trophy_change
+    }
+
+
+def _split_hits(total: int, count: int) -> Optional[List[int]]:
+    """Split total trophies into count hits that each match a star bucket, or None if none fit.
+
+    Hits are 1-32 trophies or a 40 trophy 3-star. As few 3-stars as possible are
+    used and the rest is split evenly, since only the total is known.
+    """
+    for three_stars in range(count + 1):
+        rest, others = total - 40 * three_stars, count - three_stars
+        if others == 0:
+            return [40] * three_stars if rest == 0 else None
+        if others <= rest <= 32 * others:
+            base, extra = divmod(rest, others)
+            return [40] * three_stars + [base + 1] * extra + [base] * (others - extra)
+    return None
+
+
+def decompose_trophy_change(trophy_change: int, attacks: int, held_defenses: int = 0) -> List[int]:
+    """Split a trophy delta seen between two polls into the individual hits behind it.
+
+    attacks and held_defenses are how much attack_wins and defense_wins grew over the
+    same window. Trophy losses without an attack are split into the fewest defenses
+    that explain them. Every split hit maps to a star count; falls back to
+    [trophy_change] when the counters cannot explain the delta that way.
+    """
+    if attacks < 0 or held_defenses < 0:
+        # Counters reset at the end of a season
+        return [trophy_change]
+
+    if attacks == 0 and trophy_change < 0:
+        losses = -trophy_change
+        # At most 32 trophies a defense always fits, so adding defenses ends the search
+        defenses = -(-losses // 40)
+        split = _split_hits(losses, defenses)
+        while split is None:
+            defenses += 1
+            split = _split_hits(losses, defenses)
+        hits = [-hit for hit in split]
+    elif attacks > 0 and attacks <= trophy_change <= 40 * attacks:
+        # No split into valid hits: keep it as one merged event rather than invent hits
+        hits = _split_hits(trophy_change, attacks) or [trophy_change]
+    elif trophy_change != 0:
+        # Attacks and defenses in the same window can't be told apart
+        hits = [trophy_change]
+    else:
+        hits = []
+
+    # Held defenses don't cost any trophies
+    hits += [0] * held_defenses
+    return hits or [trophy_change]
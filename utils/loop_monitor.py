@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "How late the loop monitor's timer fired",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+SLOW_CALLBACKS = Counter("event_loop_slow_callbacks_total", "Callbacks that held the event loop past the threshold")
+
+_original_handle_run = asyncio.events.Handle._run
+_active_monitor: Optional["LoopMonitor"] = None
+
+
+def _describe_callback(handle: asyncio.Handle) -> str:
+    """Name the coroutine behind a task step, or the plain callback"""
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f"{getattr(coro, '__qualname__', repr(coro))} (task {task.get_name()})"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def _timed_handle_run(handle: asyncio.Handle):
+    start = time.perf_counter()
+    try:
+        _original_handle_run(handle)
+    finally:
+        duration = time.perf_counter() - start
+        monitor = _active_monitor
+        if monitor and duration >= monitor.slow_callback_threshold:
+            monitor.record_slow_callback(handle, duration)
+
+
+def loop_implementation() -> str:
+    loop = asyncio.get_running_loop()
+    return f"{type(loop).__module__}.{type(loop).__name__}"
+
+
+def slow_callbacks_observable() -> bool:
+    """Whether the running loop runs its callbacks through asyncio's Handle, which start() patches"""
+    return isinstance(asyncio.get_running_loop(), asyncio.BaseEventLoop)
+
+
+class LoopMonitor:
+    """Watchdog for the event loop.
+
+    A timer measures how late the loop wakes it every interval seconds, and every
+    callback that runs longer than slow_callback_threshold is recorded with the
+    coroutine it belongs to, like asyncio debug mode but cheap enough to leave on.
+    Slow callbacks are only seen on the default asyncio loop, not on uvloop.
+    """
+
+    def __init__(self, interval: float = 0.5, slow_callback_threshold: float = 0.1, history: int = 600):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.lags: Deque[float] = deque(maxlen=history)
+        self.slow_callbacks: Deque[Tuple[float, float, str]] = deque(maxlen=50)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        global _active_monitor
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        _active_monitor = self
+        asyncio.events.Handle._run = _timed_handle_run
+        if not slow_callbacks_observable():
+            logger.warning(f"Slow callbacks are not monitored on {loop_implementation()}; set USE_UVLOOP=false to see them")
+
+    def stop(self):
+        global _active_monitor
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if _active_monitor is self:
+            _active_monitor = None
+            asyncio.events.Handle._run = _original_handle_run
+
+    async def _run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def record_slow_callback(self, handle: asyncio.Handle, duration: float):
+        name = _describe_callback(handle)
+        self.slow_callbacks.append((time.time(), duration, name))
+        SLOW_CALLBACKS.inc()
+        logger.warning(f"Slow callback blocked the event loop for {duration * 1000:.0f}ms: {name}")
+
+    def lag_percentile(self, percentile: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def report(self) -> Dict[str, Any]:
+        """Summary of recent loop health"""
+        slowest: List[Tuple[float, float, str]] = sorted(self.slow_callbacks, key=lambda entry: entry[1], reverse=True)
+        return {
+            "loop": loop_implementation(),
+            "slow_callbacks_monitored": slow_callbacks_observable(),
+            "tasks": len(asyncio.all_tasks()),
+            "lag_current": self.lags[-1] if self.lags else 0.0,
+            "lag_p50": self.lag_percentile(0.5),
+            "lag_p99": self.lag_percentile(0.99),
+            "lag_max": self.max_lag,
+            "window": len(self.lags) * self.interval,
+            "slow_callbacks": slowest[:5],
+        }
@@ -0,0 +1,86 @@
+import sys
+from datetime import date
+from typing import Dict, Iterator, Optional, Tuple
+
+from utils.trophy_tracker import DAILY_AGGREGATES, TrophyTracker
+
+
+class PlayerState:
+    """Everything kept in memory about one tracked player between polls"""
+
+    __slots__ = ("channels", "tracker", "next_poll", "interval", "last_change")
+
+    def __init__(self, history_size: int = 8):
+        # Channels posting this player's hits
+        self.channels: Tuple[int, ...] = ()
+        # Trophy count, win counters, recent hits and today's totals
+        self.tracker = TrophyTracker(history_size)
+        # Poll schedule, in time.monotonic() seconds
+        self.next_poll: Optional[float] = None
+        self.interval: Optional[float] = None
+        self.last_change: Optional[float] = None
+
+
+class PlayerStateTable:
+    """Tracking state for every player this worker tracks, keyed by interned tag.
+
+    One slotted record per player replaces the parallel per-tag dicts the cog and
+    the poll scheduler used to keep, so a tracked player costs a few hundred bytes.
+    """
+
+    def __init__(self, history_size: int = 8):
+        self.history_size = history_size
+        self._states: Dict[str, PlayerState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._states
+
+    def items(self) -> Iterator[Tuple[str, PlayerState]]:
+        return iter(self._states.items())
+
+    def get(self, tag: str) -> Optional[PlayerState]:
+        return self._states.get(tag)
+
+    def get_or_create(self, tag: str) -> PlayerState:
+        state = self._states.get(tag)
+        if state is None:
+            state = self._states[sys.intern(tag)] = PlayerState(self.history_size)
+        return state
+
+    def pop(self, tag: str) -> Optional[PlayerState]:
+        return self._states.pop(tag, None)
+
+    def memory_report(self) -> Dict[str, float]:
+        """Approximate bytes held by the table, including tags and field values"""
+        seen = set()
+        total = sys.getsizeof(self._states)
+        for tag, state in self._states.items():
+            total += sys.getsizeof(tag) + sys.getsizeof(state) + state.tracker.sizeof()
+            for slot in ("channels", "next_poll", "interval", "last_change"):
+                value = getattr(state, slot)
+                # Shared objects (None, small ints, the empty tuple) are counted once
+                if id(value) not in seen:
+                    if value is None or value == () or (type(value) is int and -5 <= value <= 256):
+                        seen.add(id(value))
+                    total += sys.getsizeof(value)
+        players = len(self._states)
+        return {
+            "players": players,
+            "bytes": total,
+            "bytes_per_player": total / players if players else 0.0,
+        }
+
+    def activity_report(self, legend_day: date) -> Dict[str, int]:
+        """Totals of every tracker on legend_day, and the hits held in recent history"""
+        report = dict.fromkeys(DAILY_AGGREGATES, 0)
+        report["history"] = 0
+        for state in self._states.values():
+            tracker = state.tracker
+            report["history"] += len(tracker.changes)
+            if tracker.legend_day == legend_day:
+                for field, value in tracker.daily_totals().items():
+                    report[field] += value
+        return report
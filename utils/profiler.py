@@ -0,0 +1,138 @@
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames that only show the profiler itself in allocation stats
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _function_name(key) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name
+    if filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{line}({name})"
+
+
+class Profiler:
+    """cProfile and tracemalloc session that can be started and stopped on a live bot.
+
+    The profile covers everything that runs on the event loop thread, so the tracking
+    loop, the CoC client and the Mongo driver's coroutines all show up without any
+    instrumentation; time spent inside the driver's I/O threads shows up in the
+    mongo_command_seconds metric instead. Allocation sites are the difference between the tracemalloc
+    snapshots taken at start and stop.
+    """
+
+    def __init__(self, output_dir: str = "profiles", top: int = 15, frames: int = 10):
+        self.output_dir = output_dir
+        self.top = top
+        self.frames = frames
+
+        self._profile: Optional[cProfile.Profile] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    def start(self):
+        if self._profile:
+            raise RuntimeError("A profile is already running")
+
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(self.frames)
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        self._started_at = time.time()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        logger.info("Profiling started")
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stop the session, write it out and return a summary"""
+        if not self._profile:
+            raise RuntimeError("No profile is running")
+
+        profile, self._profile = self._profile, None
+        profile.disable()
+        duration = time.time() - self._started_at
+        snapshot = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        # Sorting the stats and writing the files would otherwise stall the loop
+        return await asyncio.to_thread(
+            self._write, profile, self._baseline, snapshot, self._started_at, duration
+        )
+
+    async def run(self, seconds: float) -> Dict[str, Any]:
+        """Profile the bot for the given number of seconds"""
+        self.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            summary = await self.stop()
+        return summary
+
+    def toggle(self):
+        """Start a session, or stop the running one in the background; for use as a signal handler"""
+        if self.active:
+            asyncio.create_task(self._stop_and_log())
+        else:
+            self.start()
+
+    async def _stop_and_log(self):
+        try:
+            summary = await self.stop()
+        except Exception as e:
+            logger.error(f"Error writing profile: {e}")
+            return
+        logger.info(f"Profile of {summary['duration']:.0f}s written to {summary['path']}")
+
+    def _write(self, profile, baseline, snapshot, started_at: float, duration: float) -> Dict[str, Any]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S", time.localtime(started_at)))
+
+        report = io.StringIO()
+        stats = pstats.Stats(profile, stream=report)
+        stats.dump_stats(f"{path}.prof")
+        top_functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        allocations = snapshot.compare_to(baseline, "lineno")[:self.top]
+
+        report.write(f"Profile of {duration:.1f}s started {time.ctime(started_at)}\n\n")
+        for sort_key in ("tottime", "cumulative"):
+            stats.sort_stats(sort_key).print_stats(self.top * 2)
+        report.write("Allocation growth by line\n\n")
+        for stat in allocations:
+            report.write(f"{stat}\n")
+        with open(f"{path}.txt", "w") as report_file:
+            report_file.write(report.getvalue())
+
+        return {
+            "path": f"{path}.txt",
+            "duration": duration,
+            "top_functions": [
+                (_function_name(key), calls, own_time, total_time)
+                for key, (_, calls, own_time, total_time, _) in top_functions
+            ],
+            "top_allocations": [
+                (str(stat.traceback[0]), stat.size_diff, stat.count_diff) for stat in allocations
+            ],
+        }
@@ -1,20 +1,56 @@
+import sys
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from utils.legend_day import get_legend_day, get_legend_day_bounds
+from utils.legend_stats import daily_stats_increments, decompose_trophy_change
+
+# Running totals kept for the current legend day, as named in daily_stats
+DAILY_AGGREGATES = ("attacks", "defenses", "attack_stars", "defense_stars", "offense_trophies", "defense_trophies")
 
 
 @dataclass
 class TrophyChange:
+    __slots__ = ("old_count", "new_count", "timestamp")
+
     old_count: int
     new_count: int
     timestamp: datetime
 
+    @property
+    def trophy_change(self) -> int:
+        return self.new_count - self.old_count
+
 
 class TrophyTracker:
-    def __init__(self):
+    """Trophy state for one tracked player.
+
+    The first count seeds the tracker. Every later update is split into hits using
+    the win counters; hits go into a ring buffer of the last `capacity` changes and
+    into running totals for the current legend day. The first update after the
+    legend day reset rolls the totals over, starting the new day from the last
+    count seen before the reset. Times are timezone-aware; day boundaries come
+    from utils.legend_day.
+    """
+
+    __slots__ = (
+        "capacity", "legend_day", "_day_end", "_daily_start", "_last_count",
+        "_attack_wins", "_defense_wins", "_changes", "_next"
+    ) + DAILY_AGGREGATES
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self.legend_day: Optional[date] = None
+        self._day_end: Optional[datetime] = None
         self._daily_start: Optional[int] = None
         self._last_count: Optional[int] = None
-        self._changes = []
+        self._attack_wins: Optional[int] = None
+        self._defense_wins: Optional[int] = None
+        # Grows up to capacity, then _next marks the oldest entry
+        self._changes: List[TrophyChange] = []
+        self._next = 0
+        self._reset_aggregates()
 
     @property
     def daily_start(self) -> Optional[int]:
@@ -24,30 +60,146 @@ class TrophyTracker:
     def last_count(self) -> Optional[int]:
         return self._last_count
 
+    @property
+    def seeded(self) -> bool:
+        return self._last_count is not None
+
+    @property
+    def changes(self) -> List[TrophyChange]:
+        """Recent changes, oldest first"""
+        return self._changes[self._next:] + self._changes[:self._next]
+
+    def seed(
+            self,
+            count: int,
+            attack_wins: Optional[int] = None,
+            defense_wins: Optional[int] = None,
+            daily_start: Optional[int] = None,
+            daily_start_at: Optional[datetime] = None,
+            now: Optional[datetime] = None
+    ):
+        """Set the baseline without recording a change.
+
+        daily_start is the stored start of the legend day, set by the reset at
+        daily_start_at. A start saved before the current legend day began belongs to
+        an earlier day, so the tracker starts from count instead.
+        """
+        self._last_count = count
+        self._attack_wins = attack_wins
+        self._defense_wins = defense_wins
+        self._start_day(now or datetime.now(timezone.utc))
+        stored_day = None
+        if daily_start_at is not None:
+            # Mongo hands datetimes back as naive UTC
+            if daily_start_at.tzinfo is None:
+                daily_start_at = daily_start_at.replace(tzinfo=timezone.utc)
+            stored_day = get_legend_day(daily_start_at)
+        if daily_start is not None and stored_day == self.legend_day:
+            self._daily_start = daily_start
+        else:
+            self._daily_start = count
+
     def set_daily_start(self, count: int):
         """Set the daily starting trophy count"""
         self._daily_start = count
 
-    def update_count(self, count: int) -> Optional[TrophyChange]:
-        """Update the trophy count and return the change if any"""
+    def roll_over(self, now: Optional[datetime] = None) -> bool:
+        """Start a new legend day if the reset has passed; returns whether it did"""
+        now = now or datetime.now(timezone.utc)
+        if self._day_end is None or now < self._day_end:
+            return False
+        self._daily_start = self._last_count
+        self._start_day(now)
+        return True
+
+    def update_count(
+            self,
+            count: int,
+            attack_wins: Optional[int] = None,
+            defense_wins: Optional[int] = None,
+            now: Optional[datetime] = None
+    ) -> List[TrophyChange]:
+        """Update the trophy count and return the hits behind the change, if any"""
+        now = now or datetime.now(timezone.utc)
         if self._last_count is None:
-            self._last_count = count
-            return None
+            self.seed(count, attack_wins, defense_wins, now=now)
+            return []
 
-        if count != self._last_count:
-            change = TrophyChange(
-                old_count=self._last_count,
-                new_count=count,
-                timestamp=datetime.utcnow()
+        self.roll_over(now)
+        trophy_change = count - self._last_count
+        if trophy_change == 0:
+            return []
+
+        # Several hits between two updates arrive as one delta; the win counters tell them apart
+        if None not in (attack_wins, defense_wins, self._attack_wins, self._defense_wins):
+            hits = decompose_trophy_change(
+                trophy_change, attack_wins - self._attack_wins, defense_wins - self._defense_wins
             )
-            self._changes.append(change)
-            self._last_count = count
-            return change
+        else:
+            hits = [trophy_change]
+        if attack_wins is not None:
+            self._attack_wins, self._defense_wins = attack_wins, defense_wins
 
-        return None
+        changes = []
+        for hit in hits:
+            change = TrophyChange(self._last_count, self._last_count + hit, now)
+            self._append(change)
+            for field, amount in daily_stats_increments(hit).items():
+                if field != "net_trophies":
+                    setattr(self, field, getattr(self, field) + amount)
+            self._last_count = change.new_count
+            changes.append(change)
+        return changes
 
     def get_daily_change(self) -> Optional[int]:
         """Get the trophy change since daily start"""
         if self._daily_start is None or self._last_count is None:
             return None
-        return self._last_count - self._daily_start
\ No newline at end of file
+        return self._last_count - self._daily_start
+
+    def daily_totals(self) -> Dict[str, int]:
+        """Get the current legend day's running totals, keyed like daily_stats"""
+        return {field: getattr(self, field) for field in DAILY_AGGREGATES}
+
+    def sizeof(self) -> int:
+        """Approximate bytes held by the tracker and its history"""
+        total = sys.getsizeof(self) + sys.getsizeof(self._changes)
+        for change in self._changes:
+            total += sys.getsizeof(change) + sys.getsizeof(change.timestamp)
+        return total
+
+    def _append(self, change: TrophyChange):
+        if len(self._changes) < self.capacity:
+            self._changes.append(change)
+            return
+        self._changes[self._next] = change
+        self._next = (self._next + 1) % self.capacity
+
+    def _start_day(self, now: datetime):
+        start, end = get_legend_day_bounds(now)
+        self.legend_day = start.date()
+        self._day_end = end
+        self._reset_aggregates()
+
+    def _reset_aggregates(self):
+        for field in DAILY_AGGREGATES:
+            setattr(self, field, 0)
+
+class AdaptivePollInterval:
+    """Polling interval policy for a tracked player.
+
+    Players that changed recently are polled at min_interval; once they have been
+    idle for longer than hot_window the interval grows by backoff up to max_interval.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, hot_window: float = 600, backoff: float = 1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hot_window = hot_window
+        self.backoff = backoff
+
+    def next_interval(self, current: float, idle_for: float) -> float:
+        """Get the next interval given the current one and seconds since the player's last change"""
+        if idle_for < self.hot_window:
+            return self.min_interval
+        return min(self.max_interval, max(self.min_interval, current * self.backoff))